@@ -1,24 +1,20 @@
 import streamlit as st
 import os
-import spacy
 import pandas as pd
 from groq import Groq
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
-import re
-
-try:
-    import PyPDF2
-    PDF_AVAILABLE = True
-except:
-    PDF_AVAILABLE = False
-
-try:
-    import docx
-    DOCX_AVAILABLE = True
-except:
-    DOCX_AVAILABLE = False
+import json
+
+from core import config
+from core.corpus import add_to_corpus, get_corpus, in_corpus, list_documents, search_corpus
+from core.chunking import iter_chunks, iter_page_chunks
+from core.entities import entities_key, extract_enhanced_entities as extract_entities
+from core.extract import iter_pages
+from core.pipeline import run_document_pipeline
+from core.retrieval import build_answer_prompt, hybrid_search
+from core.summarize import analyse_chunks, build_analysis_prompt, complete, ordered_chunks
+from core.risk import detect_risks_full, get_risk_score, parse_risks
+from core.store import delete_document, doc_id_for, get_document_collection, index_document, index_pages, is_indexed
+from core.registry import registry
 
 # ------------------------
 # CONFIG
@@ -31,12 +27,10 @@ except:
         st.error("⚠️ GROQ_API_KEY not found! Please add it in Streamlit secrets.")
         st.stop()
         
-client = Groq(api_key=GROQ_API_KEY)
-nlp = spacy.load("en_core_web_sm")
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
-
-chroma_client = chromadb.Client(Settings(persist_directory="vectordb", anonymized_telemetry=False))
-collection = chroma_client.get_or_create_collection(name="docs")
+# Heavy objects live in the process-wide registry so reruns and sessions share them
+registry.register("groq", lambda: Groq(api_key=GROQ_API_KEY))
+if config.WARMUP:
+    registry.warmup()
 
 # ------------------------
 # MINIMAL PRO CSS
@@ -388,239 +382,195 @@ hr {
 # ------------------------
 # HELPER FUNCTIONS
 # ------------------------
-def extract_text(file):
-    try:
-        if file.name.endswith(".pdf"):
-            if not PDF_AVAILABLE:
-                st.error("PyPDF2 not installed. Run: pip install PyPDF2")
-                return None
-            reader = PyPDF2.PdfReader(file)
-            return "\n".join([p.extract_text() for p in reader.pages if p.extract_text()])
-        elif file.name.endswith(".docx"):
-            if not DOCX_AVAILABLE:
-                st.error("python-docx not installed. Run: pip install python-docx")
-                return None
-            doc = docx.Document(file)
-            return "\n".join([p.text for p in doc.paragraphs if p.text.strip()])
+def process_upload(file, status):
+    # Extraction streams into embedding while classification, NER and optional
+    # LLM prefetches run concurrently; results land in session state as they finish
+    data = file.getvalue()
+    doc_id = doc_id_for(data)
+    progress = st.progress(0.0, text="📄 Extracting pages...")
+    pages_seen, timings, state = [], {}, {}
+
+    def on_page(page):
+        pages_seen.append(page)
+        progress.progress(page["page"] / page["pages"], text=f"📄 Page {page['page']} of {page['pages']}")
+
+    def on_result(name, value, seconds, error):
+        timings[name] = seconds
+        if error is not None:
+            status.write(f"⚠️ {name} failed: {error}")
+        elif name == "text":
+            state["text"] = value
+        elif name == "index":
+            status.write(f"🧠 Indexed for Q&A in {seconds}s")
+        elif name == "classify":
+            st.session_state.document_type = value
+            status.write(f"🔍 Detected as **{value}** in {seconds}s")
+        elif name == "entities":
+            save_entities(state["text"], st.session_state.document_type, value)
+            status.write(f"🏷 {len(value)} entities extracted in {seconds}s")
         else:
-            return file.read().decode("utf-8")
-    except Exception as e:
-        st.error(f"❌ Error extracting text: {e}")
-        return None
+            status.write(f"⚡ {name.capitalize()} prefetched in {seconds}s")
 
-def split_text(text, chunk_size=500):
-    return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
+    followups = {"entities": extract_enhanced_entities}
+    if config.LLM_CACHE and config.PREFETCH_RISKS:
+        followups["risks"] = detect_risks
+    if config.LLM_CACHE and config.PREFETCH_ANALYSIS:
+        followups["analysis"] = lambda text, doc_type: generate_analysis(
+            text, doc_type, get_document_collection(registry.get("chroma"), doc_id))
 
-def build_vector_db(text):
     try:
-        collection.delete(where={"source": "doc"})
-        chunks = split_text(text)
-        embeddings = embedder.encode(chunks)
-        for i, chunk in enumerate(chunks):
-            collection.add(
-                documents=[chunk],
-                embeddings=[embeddings[i].tolist()],
-                ids=[str(i)],
-                metadatas=[{"source": "doc"}]
-            )
-        return True
-    except Exception as e:
-        st.error(f"Error building vector DB: {e}")
-        return False
+        results, errors = run_document_pipeline(
+            iter_pages(file.name, data, registry.get("pdf_pool")),
+            # Runs in a pipeline worker thread: no Streamlit calls in there
+            lambda pages: index_pages(registry.get("chroma"), doc_id, pages, registry.get("embedder"),
+                                      filename=file.name),
+            classify_document_type,
+            followups,
+            on_result=on_result,
+            on_page=on_page,
+        )
+    finally:
+        progress.empty()
 
-def ask_rag(question):
+    if "index" in errors:
+        st.error(f"❌ Error processing document: {errors['index']}")
+        return None
+    text = results.get("text")
+    if not text:
+        delete_document(registry.get("chroma"), doc_id)
+        return None
+    st.session_state.document_type = results.get("classify") or "Unknown"
+    st.session_state.doc_id = doc_id
+    st.session_state.ingest_stats = results["index"]
+    st.session_state.extract_stats = {
+        "pages": len(pages_seen),
+        "seconds": round(sum(p["seconds"] for p in pages_seen), 2),
+        "slowest_page": max(pages_seen, key=lambda p: p["seconds"])["page"],
+    }
+    st.session_state.pipeline_stats = timings
     try:
-        q_emb = embedder.encode([question])[0].tolist()
-        results = collection.query(query_embeddings=[q_emb], n_results=3)
-        context = "\n".join(results["documents"][0])
-        prompt = f"""Answer the question using ONLY the information from this document context.
-If the answer is not in the context, say "I cannot find this information in the document."
+        add_pages_to_corpus(doc_id, file.name, st.session_state.document_type, pages_seen)
+    except Exception as e:
+        status.write(f"⚠️ Could not add to corpus: {e}")
+    return text
+
+def add_pages_to_corpus(doc_id, filename, doc_type, pages):
+    # Chunk embeddings come from the embedding cache when the document was just indexed
+    return add_to_corpus(get_corpus(registry.get("chroma")), doc_id, filename, doc_type,
+                         iter_page_chunks(pages), registry.get("embedder"))
+
+def add_file_to_corpus(file):
+    data = file.getvalue()
+    doc_id = doc_id_for(data)
+    if in_corpus(get_corpus(registry.get("chroma")), doc_id):
+        return None
+    pages = list(iter_pages(file.name, data, registry.get("pdf_pool")))
+    text = "\n".join(p["text"] for p in pages if p["text"])
+    if not text:
+        return None
+    return add_pages_to_corpus(doc_id, file.name, classify_document_type(text), pages)
+
+def build_corpus_prompt(question, hits):
+    context = "\n\n".join(f"[{h['metadata']['filename']}, page {h['metadata'].get('page', '?')}]\n{h['text']}" for h in hits)
+    return f"""Answer the question using ONLY the information from these document excerpts.
+Name the document(s) each fact comes from. If the answer is not in the excerpts, say "I cannot find this information in the documents."
 
-Context:
+Excerpts:
 {context}
 
 Question: {question}
 Answer:"""
-        chat = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            max_tokens=300
-        )
-        return chat.choices[0].message.content
-    except Exception as e:
-        return f"Error: {e}"
 
-def ask_llm(prompt):
+def build_vector_db(text):
     try:
-        chat = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
-            max_tokens=500
-        )
-        return chat.choices[0].message.content
+        # Rebuilt under the upload's doc_id, which the uploader compares against
+        _, stats = index_document(registry.get("chroma"), st.session_state.doc_id, iter_chunks(text),
+                                  registry.get("embedder"), filename=st.session_state.filename)
+        st.session_state.ingest_stats = stats
+        return True
     except Exception as e:
-        return f"Error: {e}"
+        st.error(f"Error building vector DB: {e}")
+        return False
 
-def classify_document_type(text):
-    sample_text = text[:1500]
-    prompt = f"""Classify this document into ONE of these categories:
-- Resume/CV
-- Invoice
-- Contract/Agreement
-- Legal Document
-- Business Letter
-- Research Paper/Article
-- Report
-- Medical Record
-- Financial Statement
-- Receipt
-- Transcript
-- Application Form
-- Other
-
-Return ONLY the category name, nothing else.
-Document: {sample_text}
-Category:"""
+def document_collection():
+    # The collection may have been pruned by another session; rebuild it from the session's text
+    if not is_indexed(registry.get("chroma"), st.session_state.doc_id):
+        build_vector_db(st.session_state.document_text)
+    return get_document_collection(registry.get("chroma"), st.session_state.doc_id)
+
+def retrieve_context(question):
+    return hybrid_search(document_collection(), registry.get("embedder"), question,
+                         k=config.RETRIEVAL_TOP_K, reranker=registry.get("reranker"))
+
+def lookup_answer(question):
+    # (cached answer to a near-identical question or None, question embedding); the embedding
+    # is None when the answer cache is off
+    cache = registry.get("answer_cache")
+    if cache is None:
+        return None, None
     try:
-        chat = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-            max_tokens=30
-        )
-        return chat.choices[0].message.content.strip() or "Unknown"
-    except:
-        return "Unknown"
-
-def get_entity_description(label):
-    descriptions = {
-        "PERSON": "👤 Person name", "ORG": "🏢 Organization",
-        "GPE": "📍 Location", "DATE": "📅 Date",
-        "MONEY": "💰 Monetary value", "PERCENT": "📊 Percentage",
-        "TIME": "⏰ Time", "CARDINAL": "🔢 Number",
-        "EMAIL": "📧 Email", "PHONE": "📞 Phone",
-        "URL": "🔗 URL", "SKILL": "💡 Skill",
-        "INVOICE_NUMBER": "🧾 Invoice No.", "QUANTITY": "📏 Quantity"
-    }
-    return descriptions.get(label, label)
-
-def extract_emails(text):
-    return list(set(re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)))
+        q_emb = registry.get("embedder").encode([question])[0]
+        return cache.lookup(document_collection(), q_emb), q_emb
+    except Exception:
+        return None, None
 
-def extract_phones(text):
-    patterns = [r'\b\d{5}\s*\d{5}\b', r'\b\d{10}\b',
-                r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b',
-                r'\b\(\d{3}\)\s*\d{3}[-.\s]?\d{4}\b',
-                r'\b\+91[-.\s]?\d{10}\b']
-    phones = []
-    for p in patterns:
-        phones.extend(re.findall(p, text))
-    return list(set([' '.join(ph.split()) for ph in phones]))
+def remember_answer(question, q_emb, answer, hits):
+    cache = registry.get("answer_cache")
+    if cache is not None and q_emb is not None:
+        cache.put(document_collection(), question, q_emb, answer, hits)
 
-def extract_urls(text):
-    return list(set(re.findall(r'https?://[^\s]+|www\.[^\s]+', text)))
+def build_rag_prompt(question, hits=None):
+    return build_answer_prompt(question, retrieve_context(question) if hits is None else hits)
 
-def extract_skills_with_llm(text):
+def ask_rag_stream(question, hits=None):
     try:
-        chat = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": f"Extract professional skills from this resume as comma-separated list only:\n{text[:2000]}"}],
-            temperature=0.1, max_tokens=200
-        )
-        return [s.strip() for s in chat.choices[0].message.content.split(',') if s.strip()][:10]
-    except:
-        return []
+        yield from registry.get("llm").stream(build_rag_prompt(question, hits), temperature=0.2, max_tokens=300)
+    except Exception as e:
+        yield f"Error: {e}"
 
-def extract_enhanced_entities(text, doc_type):
-    doc = nlp(text)
-    entities = []
-    seen = set()
-
-    for email in extract_emails(text):
-        if email not in seen:
-            entities.append({"Entity": email, "Type": "EMAIL", "Description": get_entity_description("EMAIL"), "Context": "Contact info"})
-            seen.add(email)
-
-    for phone in extract_phones(text):
-        if phone not in seen:
-            entities.append({"Entity": phone, "Type": "PHONE", "Description": get_entity_description("PHONE"), "Context": "Contact info"})
-            seen.add(phone)
-
-    for url in extract_urls(text):
-        if url not in seen:
-            entities.append({"Entity": url[:50], "Type": "URL", "Description": get_entity_description("URL"), "Context": "Web reference"})
-            seen.add(url)
-
-    for ent in doc.ents:
-        t = ent.text.strip()
-        if not t or t in seen or len(t) <= 1:
-            continue
-        if ent.label_ == "DATE" and re.match(r'^[\d\s\-\.()]+$', t):
-            continue
-        etype = ent.label_
-        if etype == "GPE" and t.isupper() and len(t) > 3:
-            etype = "PERSON"
-        if etype == "ORG" and ("resume" in doc_type.lower() or "cv" in doc_type.lower()):
-            if any(k in t.lower() for k in ["management", "planning", "service", "operations", "strategic", "excellence"]):
-                etype = "SKILL"
-        entities.append({"Entity": t, "Type": etype, "Description": get_entity_description(etype),
-                        "Context": ent.sent.text[:80] + "..." if len(ent.sent.text) > 80 else ent.sent.text})
-        seen.add(t)
-
-    if "resume" in doc_type.lower() or "cv" in doc_type.lower():
-        for skill in extract_skills_with_llm(text):
-            if skill not in seen:
-                entities.append({"Entity": skill, "Type": "SKILL", "Description": get_entity_description("SKILL"), "Context": "Professional skill"})
-                seen.add(skill)
-
-    return entities
+def classify_document_type(text):
+    # Local model answers confident cases in milliseconds; the LLM handles the rest
+    return registry.get("doc_type_classifier").classify(text)
 
-def detect_risks(text, doc_type):
-    prompt = f"""You are a legal risk analyst. Analyze this document and identify risky clauses.
-
-For each risk, return EXACTLY:
-RISK_START
-Level: High/Medium/Low
-Clause: [risky text]
-Reason: [why risky]
-Suggestion: [what to do]
-RISK_END
-
-Document Type: {doc_type}
-Document: {text[:3000]}"""
+def extract_enhanced_entities(text, doc_type):
+    return extract_entities(text, doc_type, registry.get("llm"))
+
+def save_entities(text, doc_type, entities):
+    registry.get("entity_cache").put(entities_key(text, doc_type), json.dumps(entities).encode("utf-8"))
+
+def get_entities_table(text, doc_type):
+    key = entities_key(text, doc_type)
+    memo = st.session_state.entity_table
+    if memo and memo["key"] == key:
+        return memo["df"], memo["csv"]
+    cached = registry.get("entity_cache").get(key)
+    if cached is not None:
+        entities = json.loads(cached)
+    else:
+        entities = extract_enhanced_entities(text, doc_type)
+        save_entities(text, doc_type, entities)
+    df = pd.DataFrame(entities)
+    st.session_state.entity_table = {"key": key, "df": df, "csv": df.to_csv(index=False)}
+    return df, st.session_state.entity_table["csv"]
+
+def generate_analysis(text, doc_type, collection, on_section=None, on_delta=None):
+    # Short documents fit in one prompt; longer ones are summarised section by section
     try:
-        chat = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2, max_tokens=1000
-        )
-        return chat.choices[0].message.content
+        if len(text) <= config.SUMMARY_DIRECT_CHARS:
+            return complete(registry.get("llm"), build_analysis_prompt(text, doc_type), on_delta,
+                            temperature=0.3, max_tokens=500)
+        return analyse_chunks(ordered_chunks(collection), doc_type, registry.get("llm"),
+                              registry.get("summary_cache"), collection.name, on_section, on_delta)
     except Exception as e:
         return f"Error: {e}"
 
-def parse_risks(risk_text):
-    risks = []
-    for block in re.findall(r'RISK_START(.*?)RISK_END', risk_text, re.DOTALL):
-        risk = {}
-        for field, key in [('Level', 'Level'), ('Clause', 'Clause'), ('Reason', 'Reason'), ('Suggestion', 'Suggestion')]:
-            m = re.search(rf'{field}:\s*(.*?)(?:\n|$)', block)
-            if m:
-                risk[key] = m.group(1).strip()
-        if risk:
-            risks.append(risk)
-    return risks
-
-def get_risk_score(risks):
-    if not risks:
-        return 0, "Safe ✅", "low"
-    score = min(sum({"High": 30, "Medium": 15, "Low": 5}.get(r.get("Level", "Low"), 5) for r in risks), 100)
-    if score >= 60:
-        return score, "High Risk", "high"
-    elif score >= 30:
-        return score, "Medium Risk", "medium"
-    return score, "Low Risk", "low"
+def detect_risks(text, doc_type):
+    # Scans the whole document segment by segment; unchanged segments come from the LLM cache.
+    # Returns (risk text, segments that failed), or (error, None) when none could be scanned
+    try:
+        return detect_risks_full(text, doc_type, registry.get("llm"))
+    except Exception as e:
+        return f"Error: {e}", None
 
 # ------------------------
 # PAGE SETUP
@@ -637,38 +587,57 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Session state
-for key in ['document_text', 'document_type', 'filename']:
+for key in ['document_text', 'document_type', 'filename', 'doc_id', 'ingest_stats', 'extract_stats', 'pipeline_stats', 'entity_table', 'last_answer']:
     if key not in st.session_state:
         st.session_state[key] = None
+if 'corpus_files' not in st.session_state:
+    st.session_state.corpus_files = set()
 
 # Upload Section
 st.markdown('<div class="upload-section fade-in">', unsafe_allow_html=True)
-uploaded = st.file_uploader("📤 Drop your document here — PDF, DOCX, or TXT", type=["pdf", "docx", "txt"])
+uploaded_files = st.file_uploader("📤 Drop your documents here — PDF, DOCX, or TXT (add several to build a searchable corpus)",
+                                  type=["pdf", "docx", "txt"], accept_multiple_files=True)
 st.markdown('</div>', unsafe_allow_html=True)
+# The most recently added file is the one analysed in the tabs; every file joins the corpus
+uploaded = uploaded_files[-1] if uploaded_files else None
 
 if uploaded:
-    if st.session_state.filename != uploaded.name:
-        with st.spinner("⚡ Processing your document..."):
-            document_text = extract_text(uploaded)
-            if document_text:
-                st.session_state.document_text = document_text
-                st.session_state.filename = uploaded.name
-                if build_vector_db(document_text):
-                    st.session_state.document_type = classify_document_type(document_text)
-                    st.markdown(f"""
-                    <div class="success-banner fade-in">
-                        ✅ Document processed successfully! &nbsp;|&nbsp; 
-                        Detected as: <strong>{st.session_state.document_type}</strong> &nbsp;|&nbsp;
-                        {len(document_text.split()):,} words
-                    </div>
-                    """, unsafe_allow_html=True)
-            else:
-                st.error("❌ Failed to extract text from document")
+    # Keyed by content, so an edited file uploaded under the same name is re-indexed as a new revision
+    if doc_id_for(uploaded.getvalue()) != st.session_state.doc_id:
+        with st.status("⚡ Processing your document...") as status:
+            document_text = process_upload(uploaded, status)
+            status.update(label="✅ Document processed" if document_text else "❌ Processing failed",
+                          state="complete" if document_text else "error", expanded=False)
+        if document_text:
+            st.session_state.document_text = document_text
+            st.session_state.filename = uploaded.name
+            st.markdown(f"""
+            <div class="success-banner fade-in">
+                ✅ Document processed successfully! &nbsp;|&nbsp; 
+                Detected as: <strong>{st.session_state.document_type}</strong> &nbsp;|&nbsp;
+                {len(document_text.split()):,} words
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.error("❌ Failed to extract text from document")
+    st.session_state.corpus_files.add(uploaded.name)
+
+pending = [f for f in (uploaded_files or [])[:-1] if f.name not in st.session_state.corpus_files]
+if pending:
+    progress = st.progress(0.0, text="📚 Adding documents to the corpus...")
+    for i, f in enumerate(pending, 1):
+        try:
+            add_file_to_corpus(f)
+        except Exception as e:
+            st.warning(f"⚠️ {f.name} was not added to the corpus: {e}")
+        st.session_state.corpus_files.add(f.name)
+        progress.progress(i / len(pending), text=f"📚 {i} of {len(pending)} documents added to the corpus")
+    progress.empty()
 
 st.markdown("<br>", unsafe_allow_html=True)
 
 # Tabs
-tab1, tab2, tab3, tab4 = st.tabs(["💬  Ask Questions", "🏷  Entity Extraction", "📊  Document Intelligence", "⚠️  Risk Detector"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["💬  Ask Questions", "🏷  Entity Extraction", "📊  Document Intelligence", "⚠️  Risk Detector", "📚  Corpus Search"])
 
 # ─────────────────────────────────────────────
 # TAB 1 — ASK QUESTIONS
@@ -680,9 +649,43 @@ with tab1:
         q = st.text_input("", placeholder="e.g. What are the payment terms? Who are the parties involved?", label_visibility="collapsed")
 
         if q:
-            with st.spinner("Thinking..."):
-                ans = ask_rag(q)
-            st.markdown(f'<div class="answer-card fade-in">💡 <strong>Answer:</strong><br><br>{ans}</div>', unsafe_allow_html=True)
+            answer_box = st.empty()
+            memo = st.session_state.last_answer
+            if memo and memo["key"] == (st.session_state.doc_id, q):
+                # Rerun from another widget: show the same answer without another cache lookup
+                ans, hits, cached = memo["answer"], memo["hits"], memo["cached"]
+                answer_box.markdown(f'<div class="answer-card">💡 <strong>Answer:</strong><br><br>{ans}</div>', unsafe_allow_html=True)
+            else:
+                answer_box.markdown('<div class="answer-card fade-in">💡 <strong>Answer:</strong><br><br>Thinking...</div>', unsafe_allow_html=True)
+                cached, q_emb = lookup_answer(q)
+                delta = ""
+                if cached is not None:
+                    ans, hits = cached["answer"], cached["sources"]
+                    answer_box.markdown(f'<div class="answer-card">💡 <strong>Answer:</strong><br><br>{ans}</div>', unsafe_allow_html=True)
+                else:
+                    try:
+                        hits = retrieve_context(q)
+                    except Exception:
+                        hits = None  # ask_rag_stream retries and reports the error in the answer card
+                    ans = ""
+                    for delta in ask_rag_stream(q, hits):
+                        ans += delta
+                        answer_box.markdown(f'<div class="answer-card">💡 <strong>Answer:</strong><br><br>{ans}▌</div>', unsafe_allow_html=True)
+                    answer_box.markdown(f'<div class="answer-card">💡 <strong>Answer:</strong><br><br>{ans}</div>', unsafe_allow_html=True)
+                    if hits and ans and not delta.startswith("Error:"):
+                        remember_answer(q, q_emb, ans, hits)
+                # Errors are not kept, so the next rerun retries them
+                if ans and not delta.startswith("Error:"):
+                    st.session_state.last_answer = {"key": (st.session_state.doc_id, q), "answer": ans,
+                                                    "hits": hits, "cached": cached}
+            if cached is not None:
+                st.caption(f"⚡ Answered from cache — similar to “{cached['question']}” ({cached['similarity']:.2f})")
+            if hits:
+                with st.expander("📎 Sources"):
+                    for h in hits:
+                        page = (h["metadata"] or {}).get("page")
+                        st.caption(f"{'Page ' + str(page) + ' · ' if page else ''}score {h['score']}")
+                        st.text(h["text"][:400])
 
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -721,18 +724,16 @@ with tab2:
         st.markdown(f'<div style="text-align:center; padding: 0.5rem 0;"><span class="doc-type-badge">📄 {st.session_state.document_type}</span></div>', unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
-        # Extract entities
+        # Extract entities (computed once per document, type and pipeline version)
         with st.spinner("🔍 Extracting entities..."):
-            entities = extract_enhanced_entities(st.session_state.document_text, st.session_state.document_type)
-
-        if entities:
-            df = pd.DataFrame(entities)
+            df, csv = get_entities_table(st.session_state.document_text, st.session_state.document_type)
 
+        if not df.empty:
             # Metric cards
             st.markdown('<div class="fade-in">', unsafe_allow_html=True)
             col1, col2, col3, col4 = st.columns(4)
             metrics = [
-                ("📊", len(entities), "Total Entities"),
+                ("📊", len(df), "Total Entities"),
                 ("🎯", df["Type"].nunique(), "Entity Types"),
                 ("👤", len(df[df["Type"] == "PERSON"]), "People Found"),
                 ("🏢", len(df[df["Type"] == "ORG"]), "Organizations"),
@@ -760,7 +761,6 @@ with tab2:
             filtered_df = df[df["Type"] == selected_type] if selected_type != "All" else df
             st.dataframe(filtered_df, use_container_width=True, hide_index=True)
 
-            csv = df.to_csv(index=False)
             st.download_button("📥 Download CSV", data=csv, file_name=f"entities_{st.session_state.filename}.csv", mime="text/csv")
             st.markdown('</div>', unsafe_allow_html=True)
     else:
@@ -776,21 +776,30 @@ with tab3:
         st.markdown("Get a comprehensive AI-powered breakdown of your document's content, key insights, and recommendations.")
 
         if st.button("🚀 Generate Analysis", type="primary"):
-            prompt = f"""Analyze this document comprehensively.
-Document Type: {st.session_state.document_type}
-
-Provide:
-1. **Key Information:** Names, Organizations, Dates, Money, Locations
-2. **Summary:** 4-5 clear lines
-3. **Key Insights:** 3-4 important observations
-4. **Recommendations:** 2-3 action items
-
-Document: {st.session_state.document_text[:3000]}"""
+            progress_box = st.empty()
+            sections_box = st.empty()
+            result_box = st.empty()
+            section_summaries = {}
+            streamed = []
+
+            def on_section(level, i, summary, done, total):
+                stage = "sections" if level == 0 else f"summary groups (pass {level + 1})"
+                progress_box.markdown(f'<div class="info-banner">🧩 Summarised {done}/{total} {stage}</div>', unsafe_allow_html=True)
+                if level == 0:
+                    section_summaries[i] = summary
+                    sections_box.markdown("\n\n".join(f"**Section {k + 1}**\n\n{v}" for k, v in sorted(section_summaries.items())))
+
+            def on_delta(delta):
+                streamed.append(delta)
+                result_box.markdown(f'<div class="answer-card">{"".join(streamed)}▌</div>', unsafe_allow_html=True)
 
             with st.spinner("🤖 AI is analyzing your document..."):
-                result = ask_llm(prompt)
+                result = generate_analysis(st.session_state.document_text, st.session_state.document_type,
+                                           document_collection(), on_section, on_delta)
+            progress_box.empty()
+            sections_box.empty()
 
-            st.markdown(f'<div class="answer-card fade-in">{result}</div>', unsafe_allow_html=True)
+            result_box.markdown(f'<div class="answer-card fade-in">{result}</div>', unsafe_allow_html=True)
             st.download_button("📥 Download Analysis", data=result, file_name=f"analysis_{st.session_state.filename}.txt", mime="text/plain")
 
         st.markdown('</div>', unsafe_allow_html=True)
@@ -808,9 +817,14 @@ with tab4:
 
         if st.button("🔍 Scan for Risks", type="primary"):
             with st.spinner("🔍 Scanning for risks..."):
-                raw_risks = detect_risks(st.session_state.document_text, st.session_state.document_type)
+                raw_risks, failed = detect_risks(st.session_state.document_text, st.session_state.document_type)
                 risks = parse_risks(raw_risks)
 
+            if failed is None:
+                st.error(f"❌ Risk scan failed — {raw_risks}")
+            elif failed:
+                st.warning(f"⚠️ {failed} part(s) of the document could not be scanned, so the results below may be incomplete. Scan again to retry them.")
+
             if risks:
                 score, label, level = get_risk_score(risks)
                 high_risks = [r for r in risks if r.get("Level") == "High"]
@@ -895,19 +909,62 @@ with tab4:
 
                 # Download report
                 report = f"RISK REPORT — {st.session_state.filename}\n{'='*50}\n"
-                report += f"Score: {score}/100 — {label}\nIssues: {len(risks)}\n\n"
+                report += f"Score: {score}/100 — {label}\nIssues: {len(risks)}\n"
+                if failed:
+                    report += f"Incomplete: {failed} segment(s) could not be scanned\n"
+                report += "\n"
                 for i, r in enumerate(risks, 1):
                     report += f"{i}. [{r.get('Level','')}] {r.get('Clause','')}\n   Why: {r.get('Reason','')}\n   Fix: {r.get('Suggestion','')}\n\n"
                 st.markdown("<br>", unsafe_allow_html=True)
                 st.download_button("📥 Download Risk Report", data=report, file_name=f"risk_{st.session_state.filename}.txt", mime="text/plain")
 
-            else:
+            elif failed == 0:
                 st.markdown('<div class="success-banner fade-in">✅ No major risks detected! This document appears safe.</div>', unsafe_allow_html=True)
 
         st.markdown('</div>', unsafe_allow_html=True)
     else:
         st.markdown('<div class="info-banner fade-in">📤 Please upload a document to scan for risks</div>', unsafe_allow_html=True)
 
+# ─────────────────────────────────────────────
+# TAB 5 — CORPUS SEARCH
+# ─────────────────────────────────────────────
+with tab5:
+    corpus = get_corpus(registry.get("chroma"))
+    corpus_docs = list_documents(corpus)
+    if corpus_docs:
+        st.markdown('<div class="card fade-in">', unsafe_allow_html=True)
+        st.markdown(f'<div class="section-header">📚 Ask across {len(corpus_docs)} documents</div>', unsafe_allow_html=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            doc_types = st.multiselect("Document types", sorted({d["doc_type"] for d in corpus_docs}))
+        with col2:
+            filenames = st.multiselect("Files", [d["filename"] for d in corpus_docs
+                                                 if not doc_types or d["doc_type"] in doc_types])
+        cq = st.text_input("", placeholder="e.g. Which contracts renew automatically?", label_visibility="collapsed", key="corpus_q")
+
+        if cq:
+            hits = search_corpus(corpus, registry.get("embedder"), cq, filenames=filenames, doc_types=doc_types)
+            if not hits:
+                st.markdown('<div class="info-banner fade-in">No documents match these filters.</div>', unsafe_allow_html=True)
+            else:
+                answer_box = st.empty()
+                ans = ""
+                try:
+                    for delta in registry.get("llm").stream(build_corpus_prompt(cq, hits), temperature=0.2, max_tokens=400):
+                        ans += delta
+                        answer_box.markdown(f'<div class="answer-card">💡 <strong>Answer:</strong><br><br>{ans}▌</div>', unsafe_allow_html=True)
+                except Exception as e:
+                    ans += f"Error: {e}"
+                answer_box.markdown(f'<div class="answer-card">💡 <strong>Answer:</strong><br><br>{ans}</div>', unsafe_allow_html=True)
+                with st.expander("📎 Sources"):
+                    for h in hits:
+                        st.caption(f"{h['metadata']['filename']} · page {h['metadata'].get('page', '?')} · {h['metadata']['doc_type']}")
+                        st.text(h["text"][:400])
+
+        st.markdown('</div>', unsafe_allow_html=True)
+    else:
+        st.markdown('<div class="info-banner fade-in">📤 Upload one or more documents to search across them</div>', unsafe_allow_html=True)
+
 # ─────────────────────────────────────────────
 # SIDEBAR
 # ─────────────────────────────────────────────
@@ -928,6 +985,7 @@ with st.sidebar:
         <div>🏷️ &nbsp;<strong>Entity Extraction</strong> — Smart NER</div>
         <div>📊 &nbsp;<strong>Doc Intelligence</strong> — AI analysis</div>
         <div>⚠️ &nbsp;<strong>Risk Detector</strong> — Clause scanner</div>
+        <div>📚 &nbsp;<strong>Corpus Search</strong> — Ask across files</div>
     </div>
     """, unsafe_allow_html=True)
 
@@ -942,6 +1000,15 @@ with st.sidebar:
             ("📝", "Words", f"{len(st.session_state.document_text.split()):,}"),
             ("📄", "Est. Pages", str(max(1, len(st.session_state.document_text) // 3000))),
         ]
+        if st.session_state.extract_stats and st.session_state.filename.endswith(".pdf"):
+            stats[-1] = ("📄", "Pages", f"{st.session_state.extract_stats['pages']} in {st.session_state.extract_stats['seconds']}s")
+        if st.session_state.ingest_stats:
+            stats.append(("⚡", "Indexing", f"{st.session_state.ingest_stats['chunks_per_sec']:,} chunks/s"))
+            if st.session_state.ingest_stats.get("reused"):
+                stats.append(("♻️", "Unchanged", f"{st.session_state.ingest_stats['reused']} of "
+                                                 f"{st.session_state.ingest_stats['chunks']} chunks"))
+        elif st.session_state.doc_id:
+            stats.append(("⚡", "Indexing", "Reused"))
         for icon, label, value in stats:
             st.markdown(f"""
             <div style="display:flex; justify-content:space-between; align-items:center;
@@ -952,5 +1019,35 @@ with st.sidebar:
             </div>
             """, unsafe_allow_html=True)
 
+    model_stats = registry.stats()
+    if model_stats:
+        st.markdown("---")
+        with st.expander("⚙️ Performance"):
+            for name, s in model_stats.items():
+                if "error" in s:
+                    st.caption(f"**{name}** — failed: {s['error']}")
+                else:
+                    st.caption(f"**{name}** — {s['load_seconds']}s · {s['rss_delta_mb']} MB")
+            if registry.is_loaded("embedder") and hasattr(registry.get("embedder"), "stats"):
+                s = registry.get("embedder").stats()
+                st.caption(f"**Embedding cache** — {s['hits']} hits · {s['misses']} misses · {s['entries']:,} vectors")
+            if st.session_state.pipeline_stats:
+                steps = " · ".join(f"{k} {v}s" for k, v in st.session_state.pipeline_stats.items() if k != "text")
+                st.caption(f"**Last upload** — {steps}")
+            if registry.is_loaded("answer_cache") and registry.get("answer_cache") is not None:
+                s = registry.get("answer_cache").stats()
+                if s["hits"] + s["misses"]:
+                    st.caption(f"**Answer cache** — {s['hits']} hits · {s['misses']} misses ({s['hit_rate']:.0%})")
+            if registry.is_loaded("doc_type_classifier"):
+                s = registry.get("doc_type_classifier").stats()
+                if s["documents"]:
+                    st.caption(f"**Classifier** — {s['local_fraction']:.0%} local · {s['seconds_saved']}s saved")
+            if registry.is_loaded("llm"):
+                s = registry.get("llm").stats()
+                st.caption(f"**LLM cache** — {s['hits']} hits · {s['misses']} misses · {s['tokens_saved']:,} tokens saved")
+                if s["p50_total_ms"]:
+                    st.caption(f"**LLM latency** — first token p50 {s['p50_ttft_ms']:.0f} ms / p95 {s['p95_ttft_ms']:.0f} ms · "
+                               f"total p50 {s['p50_total_ms']:.0f} ms / p95 {s['p95_total_ms']:.0f} ms")
+
     st.markdown("---")
     st.markdown('<div style="font-size:0.75rem; color:#94a3b8; text-align:center;">Groq LLM · spaCy · ChromaDB · Streamlit</div>', unsafe_allow_html=True)
\ No newline at end of file
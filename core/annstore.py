@@ -0,0 +1,611 @@
+"""In-process vector store: one float16 matrix per collection, searched with NumPy.
+
+Implements the part of Chroma's client and collection API this repo uses
+(``get_or_create_collection``, ``upsert``, ``query``, ``get``, ``delete``,
+``count``, ``modify`` and ``where`` filters), so it can stand in for Chroma
+behind :func:`core.vectordb.open_vector_store`.
+
+Vectors live in ``<path>/<collection>/vectors.f16`` (with their squared norms
+in ``norms.f32``), memory-mapped, so a collection costs no RAM until it is
+searched and the OS pages it in. Ids, documents and metadata sit in one SQLite
+catalogue. Collections up to ``ANN_EXACT_MAX`` vectors are scanned exactly;
+larger ones get an IVF index (k-means buckets, ``ANN_NPROBE`` probed per query)
+that is saved next to the vectors and rebuilt once enough rows have changed
+since it was built. Converting float16 to float32 costs more than the matrix
+product itself, so recently searched collections keep a float32 copy in an LRU
+bounded by ``ANN_CACHE_MB``. Distances are squared L2, as with Chroma's
+default space.
+
+Several processes may open the same directory. Writers to a collection are
+serialised by an ``fcntl`` lock on ``<path>/<collection>.lock`` and reload the
+collection's state from the catalogue before allocating rows; readers reload
+it whenever the catalogue's write sequence has moved. ``fcntl`` is POSIX-only:
+elsewhere only one process may write to a store directory.
+"""
+import json
+import math
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+from core import config
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+INITIAL_CAPACITY = 1024
+SCAN_BLOCK = 65536
+# k-means is trained on at most this many vectors per list
+TRAIN_PER_LIST = 64
+KMEANS_ITERATIONS = 10
+# Rebuild the IVF index once this fraction of its rows has changed
+REBUILD_FRACTION = 0.2
+
+_NAME = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9._-]{1,61}[a-zA-Z0-9]$")
+
+_OPS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": lambda a, b: a > b,
+    "$gte": lambda a, b: a >= b,
+    "$lt": lambda a, b: a < b,
+    "$lte": lambda a, b: a <= b,
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+}
+
+
+def matches(metadata, where):
+    """Whether ``metadata`` satisfies a Chroma-style ``where`` clause."""
+    for key, cond in where.items():
+        if key == "$and":
+            if not all(matches(metadata, c) for c in cond):
+                return False
+        elif key == "$or":
+            if not any(matches(metadata, c) for c in cond):
+                return False
+        elif key not in metadata:
+            return False
+        elif isinstance(cond, dict):
+            if not all(_OPS[op](metadata[key], operand) for op, operand in cond.items()):
+                return False
+        elif metadata[key] != cond:
+            return False
+    return True
+
+
+def _open_array(path, dtype, shape, create=False):
+    if path is None:
+        return np.zeros(shape, dtype)
+    return np.memmap(path, dtype=dtype, mode="w+" if create else "r+", shape=shape)
+
+
+def _resize(array, capacity, path):
+    shape = (capacity,) + array.shape[1:]
+    if path is None:
+        grown = np.zeros(shape, array.dtype)
+        grown[:len(array)] = array
+        return grown
+    array.flush()
+    with open(path, "r+b") as f:
+        f.truncate(int(np.prod(shape)) * array.dtype.itemsize)
+    return np.memmap(path, dtype=array.dtype, mode="r+", shape=shape)
+
+
+def _nearest(x, centroids):
+    centroid_norms = np.square(centroids).sum(1)
+    return np.concatenate([(centroid_norms - 2 * x[lo:lo + SCAN_BLOCK] @ centroids.T).argmin(1)
+                           for lo in range(0, len(x), SCAN_BLOCK)])
+
+
+def kmeans(x, k, rng, iterations=KMEANS_ITERATIONS):
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(x, centroids)
+        counts = np.bincount(assign, minlength=k)
+        nonempty = np.flatnonzero(counts)
+        starts = (np.cumsum(counts) - counts)[nonempty]
+        # Empty lists keep their previous centroid
+        centroids[nonempty] = np.add.reduceat(x[np.argsort(assign, kind="stable")], starts, axis=0) \
+            / counts[nonempty, None]
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file index: rows bucketed by their nearest k-means centroid.
+
+    ``rows`` holds every indexed row grouped by list, list ``i`` being
+    ``rows[offsets[i]:offsets[i + 1]]``. ``seq`` is the collection's write
+    sequence at build time; rows written later are searched exactly.
+    """
+
+    def __init__(self, centroids, offsets, rows, seq):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.rows = rows
+        self.seq = seq
+        self.centroid_norms = np.square(centroids).sum(1)
+
+    @property
+    def size(self):
+        return len(self.rows)
+
+    @classmethod
+    def build(cls, vectors, rows, seq, n_lists=None, seed=0):
+        n_lists = min(len(rows), n_lists or config.ANN_LISTS or max(1, int(2 * math.sqrt(len(rows)))))
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(rows, min(len(rows), TRAIN_PER_LIST * n_lists), replace=False))
+        centroids = kmeans(vectors[sample].astype(np.float32), n_lists, rng)
+        assign = np.concatenate([_nearest(vectors[rows[lo:lo + SCAN_BLOCK]].astype(np.float32), centroids)
+                                 for lo in range(0, len(rows), SCAN_BLOCK)])
+        offsets = np.zeros(n_lists + 1, np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assign, minlength=n_lists))
+        return cls(centroids, offsets, rows[np.argsort(assign, kind="stable")], seq)
+
+    def probe(self, query, nprobe=None):
+        """Rows in the ``nprobe`` lists whose centroids are nearest ``query``."""
+        distances = self.centroid_norms - 2 * self.centroids @ query
+        nprobe = min(nprobe or config.ANN_NPROBE, len(distances))
+        lists = np.argpartition(distances, nprobe - 1)[:nprobe]
+        return np.sort(np.concatenate([self.rows[self.offsets[i]:self.offsets[i + 1]] for i in lists]))
+
+    def save(self, path):
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, centroids=self.centroids, offsets=self.offsets, rows=self.rows, seq=np.int64(self.seq))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f["centroids"], f["offsets"], f["rows"], int(f["seq"]))
+
+
+class NumpyCollection:
+    def __init__(self, client, name, metadata=None, dim=None, seq=0):
+        self._client = client
+        self.name = name
+        self.metadata = metadata
+        self._dim = dim
+        self._seq = seq
+        self._dir = os.path.join(client.path, name) if client.path else None
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._loaded = False
+        self._vectors = self._norms = None
+        self._live = np.zeros(0, bool)
+        self._high = 0  # rows ever used; free rows below it are reused first
+        self._count = 0
+        self._index = None
+        self._tail = set()  # rows written since the index was built
+        self._metadatas = None  # row -> metadata, loaded on the first filtered call
+        self._masks = {}
+
+    def __repr__(self):
+        return f"NumpyCollection(name={self.name!r}, count={self.count()})"
+
+    def _path(self, filename):
+        return os.path.join(self._dir, filename) if self._dir else None
+
+    def _load(self):
+        if self._loaded:
+            return
+        if self._dim is not None and self._dir:
+            capacity = os.path.getsize(self._path("vectors.f16")) // (2 * self._dim)
+            self._vectors = _open_array(self._path("vectors.f16"), np.float16, (capacity, self._dim))
+            self._norms = _open_array(self._path("norms.f32"), np.float32, (capacity,))
+            rows = np.array([r for r, in self._client._execute(
+                "SELECT row FROM records WHERE collection = ?", (self.name,))], np.int64)
+            self._live = np.zeros(capacity, bool)
+            self._live[rows] = True
+            self._high = int(rows.max()) + 1 if len(rows) else 0
+            self._count = len(rows)
+            if os.path.exists(self._path("ivf.npz")):
+                self._index = IVFIndex.load(self._path("ivf.npz"))
+                self._tail = {r for r, in self._client._execute(
+                    "SELECT row FROM records WHERE collection = ? AND seq > ?", (self.name, self._index.seq))}
+        self._loaded = True
+
+    def _refresh(self):
+        """Load state, first dropping it if another process has written since it was loaded."""
+        if self._dir:
+            rows = self._client._execute("SELECT metadata, dim, seq FROM collections WHERE name = ?", (self.name,))
+            if not rows:
+                self._client._forget(self)
+                raise ValueError(f"Collection {self.name} does not exist.")
+            metadata, dim, seq = rows[0]
+            self.metadata = json.loads(metadata) if metadata is not None else None
+            if (dim, seq) != (self._dim, self._seq):
+                self._reset()
+                self._client._evict(self.name)
+                self._dim, self._seq = dim, seq
+        self._load()
+
+    @contextmanager
+    def _writer(self):
+        """Hold this collection's thread and cross-process locks, with state reloaded."""
+        with self._lock:
+            if not self._dir or fcntl is None:
+                self._refresh()
+                yield
+                return
+            with open(os.path.join(self._client.path, f"{self.name}.lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._refresh()
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _create_arrays(self, dim):
+        if self._dir:
+            os.makedirs(self._dir, exist_ok=True)
+        self._vectors = _open_array(self._path("vectors.f16"), np.float16, (INITIAL_CAPACITY, dim), create=True)
+        self._norms = _open_array(self._path("norms.f32"), np.float32, (INITIAL_CAPACITY,), create=True)
+        self._live = np.zeros(INITIAL_CAPACITY, bool)
+        self._dim = dim
+        self._client._write([("UPDATE collections SET dim = ? WHERE name = ?", [(dim, self.name)])])
+
+    def _grow(self, needed):
+        capacity = max(needed, 2 * len(self._live))
+        self._vectors = _resize(self._vectors, capacity, self._path("vectors.f16"))
+        self._norms = _resize(self._norms, capacity, self._path("norms.f32"))
+        live = np.zeros(capacity, bool)
+        live[:len(self._live)] = self._live
+        self._live = live
+        if self._metadatas is not None:
+            self._metadatas.extend([None] * (capacity - len(self._metadatas)))
+
+    def _rows_for(self, ids):
+        found = {}
+        ids = list(ids)
+        for i in range(0, len(ids), 500):
+            part = ids[i:i + 500]
+            found.update(self._client._execute(
+                f"SELECT id, row FROM records WHERE collection = ? AND id IN ({','.join('?' * len(part))})",
+                [self.name, *part]))
+        return found
+
+    def _load_metadatas(self):
+        if self._metadatas is None:
+            metadatas = [None] * len(self._live)
+            for row, meta in self._client._execute(
+                    "SELECT row, metadata FROM records WHERE collection = ?", (self.name,)):
+                metadatas[row] = json.loads(meta) if meta is not None else None
+            self._metadatas = metadatas
+        return self._metadatas
+
+    def _where_mask(self, where):
+        key = json.dumps(where, sort_keys=True)
+        mask = self._masks.get(key)
+        if mask is None:
+            metadatas = self._load_metadatas()
+            mask = np.fromiter((m is not None and matches(m, where) for m in metadatas[:self._high]),
+                               bool, count=self._high)
+            mask &= self._live[:self._high]
+            if len(self._masks) >= 32:
+                self._masks.clear()
+            self._masks[key] = mask
+        return mask
+
+    def _select_rows(self, ids=None, where=None):
+        if ids is not None:
+            rows = np.array(sorted(self._rows_for(ids).values()), np.int64)
+        else:
+            rows = np.flatnonzero(self._live[:self._high])
+        if where:
+            rows = rows[self._where_mask(where)[rows]]
+        return rows
+
+    def _fetch(self, rows, include):
+        by_row = {}
+        rows = [int(r) for r in rows]
+        for i in range(0, len(rows), 500):
+            part = rows[i:i + 500]
+            for row, id_, doc, meta in self._client._execute(
+                    f"SELECT row, id, document, metadata FROM records "
+                    f"WHERE collection = ? AND row IN ({','.join('?' * len(part))})", [self.name, *part]):
+                by_row[row] = (id_, doc, json.loads(meta) if meta is not None else None)
+        return {
+            "ids": [by_row[r][0] for r in rows],
+            "documents": [by_row[r][1] for r in rows] if "documents" in include else None,
+            "metadatas": [by_row[r][2] for r in rows] if "metadatas" in include else None,
+            "embeddings": [self._vectors[r].astype(np.float32).tolist() for r in rows]
+            if "embeddings" in include else None,
+        }
+
+    def _flush(self):
+        if self._dir:
+            self._vectors.flush()
+            self._norms.flush()
+
+    def count(self):
+        with self._lock:
+            self._refresh()
+            return self._count
+
+    def modify(self, name=None, metadata=None):
+        if name is not None and name != self.name:
+            raise NotImplementedError("renaming collections is not supported by the numpy backend")
+        if metadata is not None:
+            self._client._write([("UPDATE collections SET metadata = ? WHERE name = ?",
+                                  [(json.dumps(metadata), self.name)])])
+            self.metadata = metadata
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        ids = list(ids)
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("upsert needs exactly one embedding per id")
+        if len(set(ids)) != len(ids):
+            raise ValueError("Expected IDs to be unique")
+        if not ids:
+            return
+        documents = list(documents) if documents is not None else [None] * len(ids)
+        metadatas = list(metadatas) if metadatas is not None else [None] * len(ids)
+        with self._writer():
+            if self._dim is None:
+                self._create_arrays(vectors.shape[1])
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match collection "
+                                 f"dimensionality {self._dim}")
+            existing = self._rows_for(ids)
+            added = len(ids) - len(existing)
+            free = iter(np.flatnonzero(~self._live[:self._high])[:added].tolist()
+                        + list(range(self._high, self._high + added)))
+            rows = np.array([existing[i] if i in existing else next(free) for i in ids], np.int64)
+            high = max(self._high, int(rows.max()) + 1)
+            if high > len(self._live):
+                self._grow(high)
+
+            stored = vectors.astype(np.float16)
+            self._vectors[rows] = stored
+            self._client._evict(self.name)
+            self._norms[rows] = np.square(stored.astype(np.float32)).sum(1)
+            # Vectors reach disk before the catalogue points at them
+            self._flush()
+            self._seq += 1
+            self._client._write([
+                ("INSERT INTO records VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (collection, id) DO UPDATE SET "
+                 "seq = excluded.seq, document = COALESCE(excluded.document, document), "
+                 "metadata = COALESCE(excluded.metadata, metadata)",
+                 [(self.name, id_, int(row), self._seq, doc, json.dumps(meta) if meta is not None else None)
+                  for id_, row, doc, meta in zip(ids, rows, documents, metadatas)]),
+                ("UPDATE collections SET seq = ? WHERE name = ?", [(self._seq, self.name)]),
+            ])
+            self._live[rows] = True
+            self._high = high
+            self._count += added
+            if self._index is not None:
+                self._tail.update(rows.tolist())
+            if self._metadatas is not None:
+                for row, meta in zip(rows, metadatas):
+                    if meta is not None:
+                        self._metadatas[row] = meta
+            self._masks.clear()
+
+    def delete(self, ids=None, where=None):
+        with self._writer():
+            rows = self._select_rows(ids, where)
+            if not len(rows):
+                return
+            # Bumping seq tells other processes their row state is stale
+            self._seq += 1
+            self._client._write([("DELETE FROM records WHERE collection = ? AND row = ?",
+                                  [(self.name, int(r)) for r in rows]),
+                                 ("UPDATE collections SET seq = ? WHERE name = ?", [(self._seq, self.name)])])
+            self._live[rows] = False
+            self._count -= len(rows)
+            if self._metadatas is not None:
+                for row in rows:
+                    self._metadatas[row] = None
+            self._masks.clear()
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=("metadatas", "documents")):
+        with self._lock:
+            self._refresh()
+            rows = self._select_rows(ids, where)[offset or 0:]
+            if limit is not None:
+                rows = rows[:limit]
+            return self._fetch(rows, include)
+
+    def build_index(self):
+        """(Re)build and save the IVF index over every live row."""
+        with self._writer():
+            rows = np.flatnonzero(self._live[:self._high])
+            if not len(rows):
+                return
+            self._index = IVFIndex.build(self._vectors, rows, self._seq)
+            self._tail = set()
+            if self._dir:
+                self._index.save(self._path("ivf.npz"))
+
+    def _scan(self, rows, queries, k):
+        """Exact top ``k`` of ``rows`` for each query, as ``(rows, squared L2 distances)`` arrays."""
+        query_norms = np.square(queries).sum(1)
+        best_d = np.zeros((len(queries), 0), np.float32)
+        best_r = np.zeros((len(queries), 0), np.int64)
+        source = self._client._float32_copy(self)
+        source = self._vectors if source is None else source
+        for lo in range(0, len(rows), SCAN_BLOCK):
+            block = rows[lo:lo + SCAN_BLOCK]
+            if block[-1] - block[0] + 1 == len(block):
+                x = source[block[0]:block[-1] + 1].astype(np.float32, copy=False)
+            else:
+                x = source[block].astype(np.float32, copy=False)
+            d = np.concatenate([best_d, self._norms[block] - 2 * queries @ x.T + query_norms[:, None]], 1)
+            r = np.concatenate([best_r, np.broadcast_to(block, (len(queries), len(block)))], 1)
+            if d.shape[1] > k:
+                keep = np.argpartition(d, k - 1, axis=1)[:, :k]
+                d, r = np.take_along_axis(d, keep, 1), np.take_along_axis(r, keep, 1)
+            best_d, best_r = d, r
+        order = np.argsort(best_d, axis=1)
+        return np.take_along_axis(best_r, order, 1), np.maximum(np.take_along_axis(best_d, order, 1), 0)
+
+    def _use_index(self):
+        if self._count <= config.ANN_EXACT_MAX:
+            return False
+        if self._index is None or len(self._tail) > REBUILD_FRACTION * self._index.size:
+            self.build_index()
+        return True
+
+    def query(self, query_embeddings, n_results=10, where=None,
+              include=("metadatas", "documents", "distances")):
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        out = {"ids": [], "documents": [], "metadatas": [], "embeddings": [], "distances": []}
+        with self._lock:
+            self._refresh()
+            if self._count and queries.shape[1] != self._dim:
+                raise ValueError(f"Query dimension {queries.shape[1]} does not match collection "
+                                 f"dimensionality {self._dim}")
+            # Decided first: a rebuild reloads state if another process has written
+            use_index = self._use_index()
+            allowed = self._where_mask(where) if where else self._live[:self._high]
+            k = min(n_results, int(np.count_nonzero(allowed)))
+            if k == 0:
+                results = [(np.zeros(0, np.int64), np.zeros(0, np.float32))] * len(queries)
+            elif not use_index:
+                results = list(zip(*self._scan(np.flatnonzero(allowed), queries, k)))
+            else:
+                tail = np.array(sorted(self._tail), np.int64)
+                results = []
+                for q in queries:
+                    rows = np.union1d(self._index.probe(q), tail)
+                    rows = rows[allowed[rows]]
+                    if len(rows) < k:
+                        # Filter too selective for the probed lists
+                        rows = np.flatnonzero(allowed)
+                    found, distances = self._scan(rows, q[None, :], k)
+                    results.append((found[0], distances[0]))
+            for rows, distances in results:
+                got = self._fetch(rows, include)
+                for key in ("ids", "documents", "metadatas", "embeddings"):
+                    out[key].append(got[key])
+                out["distances"].append(distances.tolist() if "distances" in include else None)
+        for key in ("documents", "metadatas", "embeddings", "distances"):
+            if key not in include:
+                out[key] = None
+        return out
+
+
+class NumpyVectorStore:
+    """Chroma-compatible client for :class:`NumpyCollection` collections under ``path``.
+
+    With ``path=None`` nothing is written to disk.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        if path:
+            os.makedirs(path, exist_ok=True)
+        self._lock = threading.RLock()
+        self._collections = {}
+        self._float32 = OrderedDict()
+        self._float32_bytes = 0
+        self._db = sqlite3.connect(os.path.join(path, "catalog.sqlite3") if path else ":memory:",
+                                   check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS collections (
+            name TEXT PRIMARY KEY, metadata TEXT, dim INTEGER, seq INTEGER NOT NULL DEFAULT 0)""")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS records (
+            collection TEXT NOT NULL, id TEXT NOT NULL, row INTEGER NOT NULL, seq INTEGER NOT NULL,
+            document TEXT, metadata TEXT, PRIMARY KEY (collection, id))""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS records_row ON records (collection, row)")
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _write(self, statements):
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for sql, rows in statements:
+                    self._db.executemany(sql, rows)
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _float32_copy(self, collection):
+        """float32 copy of ``collection``'s vectors, or ``None`` when it does not fit in ``ANN_CACHE_MB``."""
+        with self._lock:
+            copy = self._float32.get(collection.name)
+            if copy is not None:
+                self._float32.move_to_end(collection.name)
+                return copy
+        budget = config.ANN_CACHE_MB * 1024 ** 2
+        if collection._high * collection._dim * 4 > budget:
+            return None
+        copy = collection._vectors[:collection._high].astype(np.float32)
+        with self._lock:
+            self._float32[collection.name] = copy
+            self._float32_bytes += copy.nbytes
+            while self._float32_bytes > budget:
+                _, old = self._float32.popitem(last=False)
+                self._float32_bytes -= old.nbytes
+        return copy
+
+    def _forget(self, collection):
+        with self._lock:
+            if self._collections.get(collection.name) is collection:
+                del self._collections[collection.name]
+
+    def _evict(self, name):
+        with self._lock:
+            copy = self._float32.pop(name, None)
+            if copy is not None:
+                self._float32_bytes -= copy.nbytes
+
+    def get_collection(self, name):
+        with self._lock:
+            if name not in self._collections:
+                rows = self._execute("SELECT metadata, dim, seq FROM collections WHERE name = ?", (name,))
+                if not rows:
+                    raise ValueError(f"Collection {name} does not exist.")
+                metadata, dim, seq = rows[0]
+                self._collections[name] = NumpyCollection(
+                    self, name, json.loads(metadata) if metadata is not None else None, dim, seq)
+            return self._collections[name]
+
+    def create_collection(self, name, metadata=None):
+        if not _NAME.match(name):
+            raise ValueError(f"Invalid collection name '{name}'")
+        with self._lock:
+            if self._execute("SELECT 1 FROM collections WHERE name = ?", (name,)):
+                raise ValueError(f"Collection {name} already exists.")
+            self._write([("INSERT INTO collections (name, metadata) VALUES (?, ?)",
+                          [(name, json.dumps(metadata) if metadata is not None else None)])])
+            return self.get_collection(name)
+
+    def get_or_create_collection(self, name, metadata=None):
+        with self._lock:
+            try:
+                return self.get_collection(name)
+            except ValueError:
+                return self.create_collection(name, metadata)
+
+    def delete_collection(self, name):
+        # Collection lock before store lock, the order every collection method takes them in
+        collection = self.get_collection(name)
+        with collection._writer():
+            self._write([("DELETE FROM records WHERE collection = ?", [(name,)]),
+                         ("DELETE FROM collections WHERE name = ?", [(name,)])])
+            collection._reset()
+            self._evict(name)
+            self._forget(collection)
+            if collection._dir:
+                shutil.rmtree(collection._dir, ignore_errors=True)
+
+    def list_collections(self):
+        return [self.get_collection(name) for name, in self._execute("SELECT name FROM collections ORDER BY name")]
@@ -0,0 +1,79 @@
+"""Semantic answer cache for repeated and near-duplicate questions about a document.
+
+A question hits when its embedding's cosine similarity to a question already
+answered on the same collection version reaches ``ANSWER_CACHE_THRESHOLD``;
+the stored answer and sources come back without retrieval or an LLM call.
+Entries are keyed by collection name and :func:`core.store.collection_version`,
+so re-indexing a document invalidates its answers (old versions age out of
+the LRU store). The store is shared by the app and the API.
+"""
+import json
+import threading
+
+import numpy as np
+
+from core import config
+from core.store import collection_version
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticAnswerCache:
+    def __init__(self, store, threshold=None, per_document=None):
+        self.store = store
+        self.threshold = threshold if threshold is not None else config.ANSWER_CACHE_THRESHOLD
+        self.per_document = per_document or config.ANSWER_CACHE_PER_DOCUMENT
+        self.hits = 0
+        self.misses = 0
+        self._similarity_sum = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(collection):
+        count, indexed_at = collection_version(collection)
+        return f"{collection.name}:{count}:{indexed_at}"
+
+    def _entries(self, key):
+        raw = self.store.get(key)
+        return json.loads(raw) if raw is not None else []
+
+    def lookup(self, collection, question_embedding):
+        """The closest cached ``{"question", "answer", "sources", "similarity"}``, or ``None`` below the threshold."""
+        entries = self._entries(self.key(collection))
+        best = None
+        if entries:
+            similarities = np.array([e["embedding"] for e in entries], np.float32) @ _unit(question_embedding)
+            i = int(similarities.argmax())
+            if similarities[i] >= self.threshold:
+                best = {"question": entries[i]["question"], "answer": entries[i]["answer"],
+                        "sources": entries[i]["sources"], "similarity": round(float(similarities[i]), 4)}
+        with self._lock:
+            if best is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._similarity_sum += best["similarity"]
+        return best
+
+    def put(self, collection, question, question_embedding, answer, sources):
+        key = self.key(collection)
+        entry = {"question": question, "embedding": [round(float(x), 4) for x in _unit(question_embedding)],
+                 "answer": answer, "sources": sources}
+        with self._lock:
+            entries = self._entries(key)[-(self.per_document - 1):] if self.per_document > 1 else []
+            self.store.put(key, json.dumps(entries + [entry]).encode("utf-8"))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "mean_hit_similarity": round(self._similarity_sum / self.hits, 4) if self.hits else 0.0,
+                "documents": self.store.stats()["entries"],
+            }
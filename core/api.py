@@ -0,0 +1,359 @@
+"""JSON HTTP API over the analysis core.
+
+    GROQ_API_KEY=... python -m core.api --port 8000
+
+Endpoints (all responses are JSON):
+
+* ``POST /upload?filename=contract.pdf`` with the raw file as the body;
+  returns ``doc_id``, ``doc_type`` and indexing stats.
+* ``POST /ask`` ``{"doc_id", "question"}``; returns ``answer``, ``sources`` and
+  whether it came from the semantic answer cache (``cached``).
+* ``POST /entities`` / ``POST /risks`` / ``POST /classify`` with
+  ``{"doc_id"}`` or ``{"text", "doc_type"?}``.
+* ``GET /health`` and ``GET /stats``.
+
+Every request shares the process-wide models in :mod:`core.registry`. At most
+``API_MAX_INFLIGHT`` requests execute at once; up to ``API_QUEUE_SIZE`` more
+wait for a slot and anything beyond that (or waiting longer than
+``API_QUEUE_TIMEOUT``) is refused with 503 and ``Retry-After``. Groq calls are
+further limited by the LLM gateway's process-wide semaphore.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from core import config
+from core.chunking import iter_chunks
+from core.entities import entities_key, extract_enhanced_entities
+from core.extract import iter_pages
+from core.metrics import percentile
+from core.pipeline import run_document_pipeline
+from core.registry import registry
+from core.retrieval import build_answer_prompt, hybrid_search
+from core.risk import detect_risks_full, get_risk_score, parse_risks
+from core.store import doc_id_for, get_document_collection, index_document, index_pages, is_indexed
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Overloaded(ApiError):
+    def __init__(self, message):
+        super().__init__(503, message)
+
+
+class AdmissionControl:
+    """Bounded concurrency with a bounded wait queue in front of it."""
+
+    def __init__(self, max_inflight=None, max_queue=None, timeout=None):
+        self.max_inflight = max_inflight or config.API_MAX_INFLIGHT
+        self.capacity = self.max_inflight + (max_queue if max_queue is not None else config.API_QUEUE_SIZE)
+        self.timeout = timeout or config.API_QUEUE_TIMEOUT
+        self._slots = threading.BoundedSemaphore(self.max_inflight)
+        self._lock = threading.Lock()
+        self.pending = 0  # executing + waiting
+        self.rejected = 0
+
+    @contextmanager
+    def admit(self):
+        with self._lock:
+            if self.pending >= self.capacity:
+                self.rejected += 1
+                raise Overloaded("server busy, queue full")
+            self.pending += 1
+        try:
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self.rejected += 1
+                raise Overloaded("server busy, timed out waiting for a worker")
+            try:
+                yield
+            finally:
+                self._slots.release()
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+
+# ------------------------
+# SERVICE FUNCTIONS
+# ------------------------
+def load_document(doc_id):
+    stored = registry.get("document_texts").get(doc_id)
+    if stored is None:
+        raise ApiError(404, f"unknown doc_id '{doc_id}'")
+    return json.loads(stored)
+
+
+def _text_and_type(body):
+    if body.get("doc_id"):
+        doc = load_document(body["doc_id"])
+        return doc["text"], doc["doc_type"]
+    text = body.get("text")
+    if not text:
+        raise ApiError(400, "provide 'doc_id' or 'text'")
+    return text, body.get("doc_type") or classify(text)
+
+
+def classify(text):
+    return registry.get("doc_type_classifier").classify(text)
+
+
+def upload(filename, data):
+    doc_id = doc_id_for(data)
+    stored = registry.get("document_texts").get(doc_id)
+    if stored is not None and is_indexed(registry.get("chroma"), doc_id):
+        doc = json.loads(stored)
+        return {"doc_id": doc_id, "doc_type": doc["doc_type"], "chars": len(doc["text"]), "reused": True}
+
+    results, errors = run_document_pipeline(
+        iter_pages(filename.lower(), data, registry.get("pdf_pool")),
+        lambda pages: index_pages(registry.get("chroma"), doc_id, pages, registry.get("embedder"), filename=filename),
+        classify,
+    )
+    if "index" in errors:
+        raise ApiError(422, f"could not process document: {errors['index']}")
+    text = results.get("text")
+    if not text:
+        raise ApiError(422, "no text could be extracted")
+    doc_type = results.get("classify") or "Unknown"
+    registry.get("document_texts").put(doc_id, json.dumps(
+        {"filename": filename, "text": text, "doc_type": doc_type}).encode("utf-8"))
+    return {"doc_id": doc_id, "doc_type": doc_type, "chars": len(text), "reused": False,
+            "ingest": results.get("index")}
+
+
+def ask(doc_id, question, k=None):
+    if not doc_id or not isinstance(doc_id, str):
+        raise ApiError(400, "'doc_id' is required")
+    if not question or not isinstance(question, str):
+        raise ApiError(400, "'question' is required")
+    if k is not None and (isinstance(k, bool) or not isinstance(k, int) or k < 1):
+        raise ApiError(400, "'k' must be a positive integer")
+    k = k or config.RETRIEVAL_TOP_K
+    doc = load_document(doc_id)
+    client = registry.get("chroma")
+    if not is_indexed(client, doc_id):
+        # Pruned since upload; rebuild from the stored text
+        index_document(client, doc_id, iter_chunks(doc["text"]), registry.get("embedder"), filename=doc["filename"])
+    collection = get_document_collection(client, doc_id)
+    embedder = registry.get("embedder")
+    # Cached answers were retrieved with the default k
+    cache = registry.get("answer_cache") if k == config.RETRIEVAL_TOP_K else None
+    if cache is not None:
+        q_emb = embedder.encode([question])[0]
+        cached = cache.lookup(collection, q_emb)
+        if cached is not None:
+            return {"answer": cached["answer"], "sources": cached["sources"], "cached": True}
+    hits = hybrid_search(collection, embedder, question, k=k,
+                         reranker=registry.get("reranker"))
+    answer = registry.get("llm").complete(build_answer_prompt(question, hits), temperature=0.2, max_tokens=300)
+    if cache is not None:
+        cache.put(collection, question, q_emb, answer, hits)
+    return {"answer": answer, "sources": hits, "cached": False}
+
+
+def entities(text, doc_type):
+    # Shares the app's entity cache, so documents seen by either are not re-extracted
+    cache = registry.get("entity_cache")
+    key = entities_key(text, doc_type)
+    cached = cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+    found = extract_enhanced_entities(text, doc_type, registry.get("llm"))
+    cache.put(key, json.dumps(found).encode("utf-8"))
+    return found
+
+
+def risks(text, doc_type):
+    risk_text, failed = detect_risks_full(text, doc_type, registry.get("llm"))
+    found = parse_risks(risk_text)
+    score, label, _ = get_risk_score(found)
+    return {"risks": found, "score": score, "label": label, "failed_segments": failed}
+
+
+# ------------------------
+# HTTP
+# ------------------------
+def _post_upload(handler, body, query):
+    filename = (query.get("filename") or [handler.headers.get("X-Filename", "")])[0]
+    if not filename.lower().endswith((".pdf", ".docx", ".txt")):
+        raise ApiError(400, "pass ?filename= ending in .pdf, .docx or .txt")
+    return upload(filename, body)
+
+
+def _post_ask(handler, body, query):
+    body = _json(body)
+    return ask(body.get("doc_id"), body.get("question"), body.get("k"))
+
+
+def _post_entities(handler, body, query):
+    text, doc_type = _text_and_type(_json(body))
+    return {"doc_type": doc_type, "entities": entities(text, doc_type)}
+
+
+def _post_risks(handler, body, query):
+    text, doc_type = _text_and_type(_json(body))
+    return {"doc_type": doc_type, **risks(text, doc_type)}
+
+
+def _post_classify(handler, body, query):
+    body = _json(body)
+    if body.get("doc_id"):
+        return {"doc_type": load_document(body["doc_id"])["doc_type"]}
+    if not body.get("text"):
+        raise ApiError(400, "provide 'doc_id' or 'text'")
+    return {"doc_type": classify(body["text"])}
+
+
+ROUTES = {
+    "/upload": _post_upload,
+    "/ask": _post_ask,
+    "/entities": _post_entities,
+    "/risks": _post_risks,
+    "/classify": _post_classify,
+}
+
+
+def _json(body):
+    try:
+        value = json.loads(body or b"{}")
+    except ValueError:
+        raise ApiError(400, "body must be JSON")
+    if not isinstance(value, dict):
+        raise ApiError(400, "body must be a JSON object")
+    return value
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, admission=None):
+        super().__init__(address, Handler)
+        self.admission = admission or AdmissionControl()
+        self.latencies = defaultdict(lambda: deque(maxlen=config.LLM_METRICS_WINDOW))
+        self.status_counts = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, route, status, seconds):
+        with self.lock:
+            self.status_counts[status] += 1
+            # Unknown paths only count towards their status, so clients cannot add routes to /stats
+            if status < 500 and route in ROUTES:
+                self.latencies[route].append(seconds * 1000)
+
+    def stats(self):
+        with self.lock:
+            routes = {route: {"requests": len(v), "p50_ms": round(percentile(list(v), 50), 1),
+                              "p95_ms": round(percentile(list(v), 95), 1),
+                              "p99_ms": round(percentile(list(v), 99), 1)}
+                      for route, v in self.latencies.items()}
+            statuses = dict(self.status_counts)
+        return {"routes": routes, "statuses": statuses, "pending": self.admission.pending,
+                "rejected": self.admission.rejected}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # per-request lines would dominate a load test; see /stats
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path.rstrip("/")
+        if path == "/health":
+            return self._send(200, {"status": "ok", "pending": self.server.admission.pending,
+                                    "models": sorted(registry.stats())})
+        if path == "/stats":
+            payload = {"api": self.server.stats()}
+            if registry.is_loaded("llm"):
+                payload["llm"] = registry.get("llm").stats()
+            if registry.is_loaded("answer_cache") and registry.get("answer_cache") is not None:
+                payload["answer_cache"] = registry.get("answer_cache").stats()
+            if registry.is_loaded("doc_type_classifier"):
+                payload["classifier"] = registry.get("doc_type_classifier").stats()
+            return self._send(200, payload)
+        self._send(404, {"error": "not found"})
+
+    def _read_body(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body cannot be skipped without knowing its length
+            self.close_connection = True
+            raise ApiError(400, "Content-Length must be a non-negative integer")
+        if length > config.API_MAX_UPLOAD_MB * 1024 ** 2:
+            self.close_connection = True
+            raise ApiError(413, f"body larger than {config.API_MAX_UPLOAD_MB} MB")
+        return self.rfile.read(length)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        route = url.path.rstrip("/")
+        start = time.perf_counter()
+        status, headers = 200, None
+        try:
+            body = self._read_body()
+            fn = ROUTES.get(route)
+            if fn is None:
+                raise ApiError(404, "not found")
+            with self.server.admission.admit():
+                payload = fn(self, body, parse_qs(url.query))
+        except Overloaded as e:
+            status, payload, headers = e.status, {"error": str(e)}, {"Retry-After": "1"}
+        except ApiError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        self.server.record(route, status, time.perf_counter() - start)
+        self._send(status, payload, headers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DocuSense AI HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if os.getenv("GROQ_API_KEY"):
+        from groq import Groq
+        registry.register("groq", lambda: Groq(api_key=os.environ["GROQ_API_KEY"]))
+    else:
+        print("GROQ_API_KEY not set: LLM-backed endpoints will fail.")
+    if config.WARMUP:
+        registry.warmup()
+
+    server = ApiServer((args.host, args.port))
+    print(f"DocuSense API on http://{args.host}:{args.port} "
+          f"({server.admission.max_inflight} workers, queue {server.admission.capacity - server.admission.max_inflight})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Headless bulk analysis of a directory of documents.
+
+    python -m core.batch incoming/ --out results.jsonl [--workers 8] [--steps classify,entities,risks]
+
+Each file is extracted, classified, and scanned for entities and risks by a
+pool of worker threads sharing the process-wide models (LLM calls are bounded
+by the gateway's semaphore). Results are appended to a JSONL file as each
+document finishes, which doubles as the checkpoint: a rerun skips every file
+already recorded without an error. ``--format parquet`` converts the JSONL to
+Parquet once the run completes.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core import config
+from core.entities import extract_enhanced_entities
+from core.extract import iter_pages
+from core.registry import registry
+from core.risk import detect_risks_full, get_risk_score, parse_risks
+from core.store import doc_id_for
+
+EXTENSIONS = (".pdf", ".docx", ".txt")
+STEPS = ("classify", "entities", "risks")
+
+
+def iter_files(root):
+    for dirpath, _, names in os.walk(root):
+        for name in sorted(names):
+            if name.lower().endswith(EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
+
+def load_checkpoint(path):
+    """Paths already processed successfully according to an existing results file."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a crash
+            if not record.get("error"):
+                done.add(record["path"])
+    return done
+
+
+def process_file(path, steps=STEPS):
+    """Analyse one file and return its result record (errors are recorded, not raised)."""
+    record = {"path": path, "filename": os.path.basename(path)}
+    timings = {}
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        record["doc_id"] = doc_id_for(data)
+
+        t = time.perf_counter()
+        pages = list(iter_pages(record["filename"].lower(), data, registry.get("pdf_pool")))
+        text = "\n".join(p["text"] for p in pages if p["text"])
+        timings["extract"] = time.perf_counter() - t
+        record["pages"] = len(pages)
+        record["chars"] = len(text)
+        if not text:
+            raise ValueError("no text extracted")
+
+        doc_type = "Unknown"
+        if "classify" in steps:
+            t = time.perf_counter()
+            doc_type = registry.get("doc_type_classifier").classify(text)
+            timings["classify"] = time.perf_counter() - t
+        record["doc_type"] = doc_type
+
+        if "entities" in steps:
+            t = time.perf_counter()
+            record["entities"] = extract_enhanced_entities(text, doc_type, registry.get("llm"))
+            timings["entities"] = time.perf_counter() - t
+
+        if "risks" in steps:
+            t = time.perf_counter()
+            risk_text, failed = detect_risks_full(text, doc_type, registry.get("llm"))
+            risks = parse_risks(risk_text)
+            score, label, _ = get_risk_score(risks)
+            record.update(risks=risks, risk_score=score, risk_label=label, risk_failed_segments=failed)
+            timings["risks"] = time.perf_counter() - t
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    record["timings"] = {k: round(v, 3) for k, v in timings.items()}
+    return record
+
+
+def run_batch(root, out, workers=None, steps=STEPS, on_record=None):
+    """Process every new file under ``root``, appending records to ``out``; returns a summary."""
+    done = load_checkpoint(out)
+    files = [p for p in iter_files(root) if p not in done]
+    summary = {"files": len(files), "skipped": len(done), "ok": 0, "failed": 0, "pages": 0}
+    step_seconds = {}
+    start = time.perf_counter()
+    with open(out, "a", encoding="utf-8") as f, \
+            ThreadPoolExecutor(max_workers=workers or config.BATCH_WORKERS) as pool:
+        futures = [pool.submit(process_file, p, steps) for p in files]
+        for future in as_completed(futures):
+            # Records are written from this thread only, in completion order
+            record = future.result()
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()  # every finished document is checkpointed immediately
+            summary["failed" if record.get("error") else "ok"] += 1
+            summary["pages"] += record.get("pages", 0)
+            for step, seconds in record["timings"].items():
+                step_seconds[step] = step_seconds.get(step, 0.0) + seconds
+            if on_record:
+                on_record(record)
+    seconds = time.perf_counter() - start
+    processed = summary["ok"] + summary["failed"]
+    summary.update(
+        seconds=round(seconds, 2),
+        docs_per_sec=round(processed / seconds, 2) if seconds > 0 else 0.0,
+        pages_per_sec=round(summary["pages"] / seconds, 2) if seconds > 0 else 0.0,
+        avg_step_seconds={k: round(v / processed, 3) for k, v in step_seconds.items()} if processed else {},
+    )
+    return summary
+
+
+def to_parquet(jsonl_path, parquet_path):
+    import pandas as pd
+    with open(jsonl_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    # A file that failed and succeeded on a later run appears twice; keep its latest record
+    df = pd.DataFrame(records).drop_duplicates("path", keep="last")
+    # Nested lists and dicts are stored as JSON strings so any Parquet reader can load them
+    for column in ("entities", "risks", "timings"):
+        if column in df:
+            df[column] = df[column].map(lambda v: json.dumps(v, ensure_ascii=False) if isinstance(v, (list, dict)) else None)
+    df.to_parquet(parquet_path, index=False)
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="directory to process (walked recursively)")
+    parser.add_argument("--out", default="batch_results.jsonl", help="JSONL results file, also the checkpoint")
+    parser.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    parser.add_argument("--workers", type=int, default=config.BATCH_WORKERS)
+    parser.add_argument("--steps", default=",".join(STEPS), help=f"comma-separated subset of {','.join(STEPS)}")
+    args = parser.parse_args()
+
+    steps = tuple(s.strip() for s in args.steps.split(",") if s.strip())
+    unknown = set(steps) - set(STEPS)
+    if unknown:
+        parser.error(f"unknown steps: {', '.join(sorted(unknown))}")
+    if os.getenv("GROQ_API_KEY"):
+        from groq import Groq
+        registry.register("groq", lambda: Groq(api_key=os.environ["GROQ_API_KEY"]))
+    else:
+        print("GROQ_API_KEY not set: LLM classification, resume skills and risk scans will fail or fall back.")
+
+    def report(record):
+        status = f"FAILED {record['error']}" if record.get("error") else record.get("doc_type", "")
+        print(f"{record['seconds']:>7.2f}s  {record['path']}  {status}")
+
+    summary = run_batch(args.root, args.out, args.workers, steps, on_record=report)
+    if args.format == "parquet":
+        parquet_path = os.path.splitext(args.out)[0] + ".parquet"
+        rows = to_parquet(args.out, parquet_path)
+        print(f"Wrote {rows} rows to {parquet_path}")
+    print(f"\n{summary['ok']} ok, {summary['failed']} failed, {summary['skipped']} already done; "
+          f"{summary['seconds']}s ({summary['docs_per_sec']} docs/s, {summary['pages_per_sec']} pages/s)")
+    if summary["avg_step_seconds"]:
+        print("Average seconds per document: " + ", ".join(f"{k} {v}" for k, v in summary["avg_step_seconds"].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Structure-aware chunking with character offsets.
+
+Text is walked as a stream of sentences (a line break also ends a sentence,
+which suits resumes and invoices). Sentences are packed into chunks up to
+``max_tokens``, a chunk is closed early at a paragraph break once it is at
+least half full, and the last ``overlap`` tokens are carried into the next
+chunk. Every chunk keeps ``start``/``end`` offsets into the original text.
+"""
+import re
+
+from core import config
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_WORD = re.compile(r"\S+")
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s|$)|\n")
+
+
+def count_tokens(text):
+    # Rough word-piece estimate; pass a tokenizer-based counter for exact sizing
+    return len(_TOKEN.findall(text))
+
+
+def _trim(text, start, end):
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _paragraph_spans(text):
+    pos = 0
+    for m in _PARAGRAPH_BREAK.finditer(text):
+        yield pos, m.start()
+        pos = m.end()
+    yield pos, len(text)
+
+
+def _sentence_spans(text, start, end):
+    pos = start
+    for m in _SENTENCE_END.finditer(text, start, end):
+        s, e = _trim(text, pos, m.end())
+        if s < e:
+            yield s, e
+        pos = m.end()
+    s, e = _trim(text, pos, end)
+    if s < e:
+        yield s, e
+
+
+def _split_long(text, start, end, max_tokens, count):
+    # A single sentence over budget is cut on word boundaries
+    piece_start = piece_end = None
+    size = 0
+    for m in _WORD.finditer(text, start, end):
+        n = count(m.group())
+        if piece_start is not None and size + n > max_tokens:
+            yield piece_start, piece_end, size
+            piece_start, size = None, 0
+        if piece_start is None:
+            piece_start = m.start()
+        piece_end = m.end()
+        size += n
+    if piece_start is not None:
+        yield piece_start, piece_end, size
+
+
+def _units(text, max_tokens, count):
+    for p_start, p_end in _paragraph_spans(text):
+        last = None
+        for s, e in _sentence_spans(text, p_start, p_end):
+            n = count(text[s:e])
+            pieces = [(s, e, n)] if n <= max_tokens else _split_long(text, s, e, max_tokens, count)
+            for piece in pieces:
+                if last is not None:
+                    yield last + (False,)
+                last = piece
+        if last is not None:
+            yield last + (True,)
+
+
+def iter_chunks(text, max_tokens=None, overlap=None, count=count_tokens):
+    """Yield ``{"index", "text", "start", "end"}`` dicts covering ``text``."""
+    max_tokens = max_tokens or config.CHUNK_TOKENS
+    overlap = config.CHUNK_OVERLAP if overlap is None else overlap
+    window = []
+    size = 0
+    fresh = False
+    index = 0
+
+    def emit():
+        start, end = window[0][0], window[-1][1]
+        return {"index": index, "text": text[start:end], "start": start, "end": end}
+
+    def carry():
+        kept, kept_size = [], 0
+        for unit in reversed(window):
+            if kept_size + unit[2] > overlap:
+                break
+            kept.insert(0, unit)
+            kept_size += unit[2]
+        return kept, kept_size
+
+    for start, end, n, paragraph_end in _units(text, max_tokens, count):
+        if fresh and size + n > max_tokens:
+            yield emit()
+            index += 1
+            window, size = carry()
+            # Drop carried context that would push the new sentence over budget
+            while window and size + n > max_tokens:
+                size -= window.pop(0)[2]
+        window.append((start, end, n))
+        size += n
+        fresh = True
+        if paragraph_end and size >= max_tokens // 2:
+            yield emit()
+            index += 1
+            window, size = carry()
+            fresh = False
+    if fresh:
+        yield emit()
+
+
+def iter_page_chunks(pages, max_tokens=None, overlap=None, count=count_tokens):
+    """Chunk a stream of extracted pages, tagging each chunk with its page number.
+
+    Offsets refer to the pages' non-empty texts joined with ``"\\n"``.
+    """
+    offset = 0
+    index = 0
+    for page in pages:
+        if not page["text"]:
+            continue
+        for chunk in iter_chunks(page["text"], max_tokens, overlap, count):
+            yield {"index": index, "text": chunk["text"], "page": page["page"],
+                   "start": offset + chunk["start"], "end": offset + chunk["end"]}
+            index += 1
+        offset += len(page["text"]) + 1
@@ -0,0 +1,100 @@
+"""Tiered document-type classification: a local TF-IDF model first, the LLM when it is unsure."""
+import os
+import threading
+import time
+
+from core import config
+
+DOC_TYPES = [
+    "Resume/CV", "Invoice", "Contract/Agreement", "Legal Document", "Business Letter",
+    "Research Paper/Article", "Report", "Medical Record", "Financial Statement", "Receipt",
+    "Transcript", "Application Form", "Other",
+]
+
+# Training folders under data/doc_types/ (category names contain "/")
+DOC_TYPE_DIRS = {
+    "resume": "Resume/CV", "invoice": "Invoice", "contract": "Contract/Agreement",
+    "legal": "Legal Document", "letter": "Business Letter", "research": "Research Paper/Article",
+    "report": "Report", "medical": "Medical Record", "financial": "Financial Statement",
+    "receipt": "Receipt", "transcript": "Transcript", "application": "Application Form", "other": "Other",
+}
+
+
+def build_classify_prompt(text):
+    categories = "\n".join(f"- {t}" for t in DOC_TYPES)
+    return f"""Classify this document into ONE of these categories:
+{categories}
+
+Return ONLY the category name, nothing else.
+Document: {text[:1500]}
+Category:"""
+
+
+def classify_with_llm(text, llm):
+    try:
+        return llm.complete(build_classify_prompt(text), temperature=0.1, max_tokens=30).strip() or "Unknown"
+    except Exception:
+        return "Unknown"
+
+
+def load_local_classifier(path=None):
+    path = path or config.DOC_TYPE_CLASSIFIER
+    if not os.path.exists(path):
+        return None
+    import joblib
+    model = joblib.load(path)
+    # Refuse models trained on other label sets (e.g. the BBC news classifier)
+    if not set(model.classes_) <= set(DOC_TYPES):
+        return None
+    return model
+
+
+class TieredClassifier:
+    def __init__(self, local_model, llm_classify, threshold=None):
+        self.local_model = local_model
+        self.llm_classify = llm_classify
+        self.threshold = config.CLASSIFIER_THRESHOLD if threshold is None else threshold
+        self.local = 0
+        self.llm = 0
+        self.local_seconds = 0.0
+        self.llm_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def predict_local(self, text):
+        if self.local_model is None:
+            return None, 0.0
+        probs = self.local_model.predict_proba([text[:config.CLASSIFIER_CHARS]])[0]
+        best = probs.argmax()
+        return self.local_model.classes_[best], float(probs[best])
+
+    def classify(self, text):
+        t = time.perf_counter()
+        label, confidence = self.predict_local(text)
+        local_seconds = time.perf_counter() - t
+        if label is not None and confidence >= self.threshold:
+            with self._lock:
+                self.local += 1
+                self.local_seconds += local_seconds
+            return label
+
+        t = time.perf_counter()
+        label = self.llm_classify(text)
+        with self._lock:
+            self.llm += 1
+            self.llm_seconds += time.perf_counter() - t
+        return label
+
+    def stats(self):
+        total = self.local + self.llm
+        avg_local = self.local_seconds / self.local if self.local else 0.0
+        avg_llm = self.llm_seconds / self.llm if self.llm else 0.0
+        return {
+            "documents": total,
+            "local": self.local,
+            "llm": self.llm,
+            "local_fraction": round(self.local / total, 3) if total else 0.0,
+            "avg_local_ms": round(avg_local * 1000, 1),
+            "avg_llm_ms": round(avg_llm * 1000, 1),
+            # Estimated from the observed average LLM latency
+            "seconds_saved": round(self.local * max(avg_llm - avg_local, 0.0), 2),
+        }
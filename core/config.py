@@ -0,0 +1,135 @@
+import os
+
+# ------------------------
+# MODELS
+# ------------------------
+SPACY_MODEL = os.getenv("DOCUSENSE_SPACY_MODEL", "en_core_web_sm")
+EMBED_MODEL = os.getenv("DOCUSENSE_EMBED_MODEL", "all-MiniLM-L6-v2")
+# "torch" (float32), "int8" (dynamically quantized torch) or "onnx" (ONNX Runtime); see core.embedding
+EMBED_BACKEND = os.getenv("DOCUSENSE_EMBED_BACKEND", "torch")
+# ONNX export inside the model repo ("" = onnx/model.onnx), e.g. onnx/model_qint8_avx512_vnni.onnx
+EMBED_ONNX_FILE = os.getenv("DOCUSENSE_EMBED_ONNX_FILE", "")
+# CPU threads used for encoding (0 = library default)
+EMBED_THREADS = int(os.getenv("DOCUSENSE_EMBED_THREADS", "0"))
+LLM_MODEL = os.getenv("DOCUSENSE_LLM_MODEL", "llama-3.1-8b-instant")
+LLM_MAX_CONCURRENCY = int(os.getenv("DOCUSENSE_LLM_MAX_CONCURRENCY", "4"))
+LLM_METRICS_WINDOW = int(os.getenv("DOCUSENSE_LLM_METRICS_WINDOW", "500"))
+DOC_TYPE_CLASSIFIER = os.getenv("DOCUSENSE_DOC_TYPE_CLASSIFIER", "models/doc_type_classifier.pkl")
+# Local predictions below this probability fall back to the LLM
+CLASSIFIER_THRESHOLD = float(os.getenv("DOCUSENSE_CLASSIFIER_THRESHOLD", "0.6"))
+CLASSIFIER_CHARS = int(os.getenv("DOCUSENSE_CLASSIFIER_CHARS", "5000"))
+
+# ------------------------
+# STORAGE
+# ------------------------
+VECTORDB_DIR = os.getenv("DOCUSENSE_VECTORDB_DIR", "vectordb")
+# "chroma" or "numpy" (in-process float16 store, core.annstore) persist under VECTORDB_DIR;
+# "memory" keeps nothing on disk
+VECTORDB_BACKEND = os.getenv("DOCUSENSE_VECTORDB_BACKEND", "chroma")
+# Memory budget for loaded collection indexes (0 = keep every queried index loaded)
+VECTORDB_CACHE_MB = int(os.getenv("DOCUSENSE_VECTORDB_CACHE_MB", "0"))
+# numpy backend: collections up to this size are searched exactly, larger ones through an IVF index
+ANN_EXACT_MAX = int(os.getenv("DOCUSENSE_ANN_EXACT_MAX", "50000"))
+# IVF lists per index (0 = 2 * sqrt(vectors)) and lists probed per query
+ANN_LISTS = int(os.getenv("DOCUSENSE_ANN_LISTS", "0"))
+ANN_NPROBE = int(os.getenv("DOCUSENSE_ANN_NPROBE", "16"))
+# float32 copies of recently searched collections (float16 is converted on every scan otherwise)
+ANN_CACHE_MB = int(os.getenv("DOCUSENSE_ANN_CACHE_MB", "256"))
+# Oldest per-document collections are dropped beyond this many
+MAX_DOCUMENTS = int(os.getenv("DOCUSENSE_MAX_DOCUMENTS", "100"))
+# Shared multi-document collection searched with metadata filters
+CORPUS_COLLECTION = os.getenv("DOCUSENSE_CORPUS_COLLECTION", "corpus")
+CORPUS_TOP_K = int(os.getenv("DOCUSENSE_CORPUS_TOP_K", "5"))
+
+# ------------------------
+# CACHES
+# ------------------------
+CACHE_DIR = os.getenv("DOCUSENSE_CACHE_DIR", ".cache")
+EMBED_CACHE = os.getenv("DOCUSENSE_EMBED_CACHE", "1") not in ("0", "false", "no")
+EMBED_CACHE_MAX_MB = int(os.getenv("DOCUSENSE_EMBED_CACHE_MAX_MB", "512"))
+EMBED_CACHE_DTYPE = os.getenv("DOCUSENSE_EMBED_CACHE_DTYPE", "float16")
+LLM_CACHE = os.getenv("DOCUSENSE_LLM_CACHE", "1") not in ("0", "false", "no")
+LLM_CACHE_TTL = float(os.getenv("DOCUSENSE_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("DOCUSENSE_LLM_CACHE_MAX_ENTRIES", "5000"))
+ENTITY_CACHE_MAX_ENTRIES = int(os.getenv("DOCUSENSE_ENTITY_CACHE_MAX_ENTRIES", "2000"))
+# Reuse an answer when a question on the same document version is at least this similar (cosine)
+# to one already answered; too low and "Who is the buyer?" starts answering "Who is the seller?"
+ANSWER_CACHE = os.getenv("DOCUSENSE_ANSWER_CACHE", "1") not in ("0", "false", "no")
+ANSWER_CACHE_THRESHOLD = float(os.getenv("DOCUSENSE_ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_PER_DOCUMENT = int(os.getenv("DOCUSENSE_ANSWER_CACHE_PER_DOCUMENT", "50"))
+ANSWER_CACHE_MAX_DOCUMENTS = int(os.getenv("DOCUSENSE_ANSWER_CACHE_MAX_DOCUMENTS", "1000"))
+
+# ------------------------
+# INGESTION
+# ------------------------
+INGEST_BATCH_SIZE = int(os.getenv("DOCUSENSE_INGEST_BATCH_SIZE", "64"))
+CHUNK_TOKENS = int(os.getenv("DOCUSENSE_CHUNK_TOKENS", "128"))
+CHUNK_OVERLAP = int(os.getenv("DOCUSENSE_CHUNK_OVERLAP", "24"))
+PDF_WORKERS = int(os.getenv("DOCUSENSE_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("DOCUSENSE_PDF_PARALLEL_MIN_PAGES", "8"))
+PDF_PAGES_PER_TASK = int(os.getenv("DOCUSENSE_PDF_PAGES_PER_TASK", "4"))
+
+# ------------------------
+# ENTITY EXTRACTION
+# ------------------------
+# Documents are cut into blocks of this many characters for nlp.pipe
+NER_BLOCK_CHARS = int(os.getenv("DOCUSENSE_NER_BLOCK_CHARS", "10000"))
+NER_BATCH_SIZE = int(os.getenv("DOCUSENSE_NER_BATCH_SIZE", "32"))
+NER_PROCESSES = int(os.getenv("DOCUSENSE_NER_PROCESSES", "1"))
+NER_CUSTOM_MODEL = os.getenv("DOCUSENSE_NER_CUSTOM_MODEL", "models/ner_model")
+# Document type -> spaCy model; written by scripts/eval_ner.py --write-routes
+NER_ROUTES_FILE = os.getenv("DOCUSENSE_NER_ROUTES_FILE", "models/ner_routes.json")
+# JSON overrides, e.g. '{"Resume/CV": "models/ner_model"}'
+NER_ROUTES = os.getenv("DOCUSENSE_NER_ROUTES", "")
+
+# ------------------------
+# RETRIEVAL
+# ------------------------
+RETRIEVAL_TOP_K = int(os.getenv("DOCUSENSE_RETRIEVAL_TOP_K", "3"))
+# Dense and BM25 each contribute this many candidates to the fusion
+RETRIEVAL_CANDIDATES = int(os.getenv("DOCUSENSE_RETRIEVAL_CANDIDATES", "20"))
+BM25_CACHE_SIZE = int(os.getenv("DOCUSENSE_BM25_CACHE_SIZE", "32"))
+RERANK = os.getenv("DOCUSENSE_RERANK", "0") in ("1", "true", "yes")
+RERANK_MODEL = os.getenv("DOCUSENSE_RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+# ------------------------
+# RISK DETECTION
+# ------------------------
+RISK_SEGMENT_CHARS = int(os.getenv("DOCUSENSE_RISK_SEGMENT_CHARS", "3000"))
+RISK_MAX_WORKERS = int(os.getenv("DOCUSENSE_RISK_MAX_WORKERS", "4"))
+
+# ------------------------
+# DOCUMENT ANALYSIS
+# ------------------------
+# Documents up to this length are analysed in one prompt, longer ones hierarchically
+SUMMARY_DIRECT_CHARS = int(os.getenv("DOCUSENSE_SUMMARY_DIRECT_CHARS", "3000"))
+# A section summary runs to ~1000 characters; groups must hold several for the reduce to shrink
+SUMMARY_GROUP_CHARS = max(3000, int(os.getenv("DOCUSENSE_SUMMARY_GROUP_CHARS", "6000")))
+SUMMARY_MAX_WORKERS = int(os.getenv("DOCUSENSE_SUMMARY_MAX_WORKERS", "4"))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("DOCUSENSE_SUMMARY_CACHE_MAX_ENTRIES", "20000"))
+
+# ------------------------
+# UPLOAD PIPELINE
+# ------------------------
+# Prefetching fills the LLM response cache so the Risk / Intelligence buttons answer instantly
+PREFETCH_RISKS = os.getenv("DOCUSENSE_PREFETCH_RISKS", "0") in ("1", "true", "yes")
+PREFETCH_ANALYSIS = os.getenv("DOCUSENSE_PREFETCH_ANALYSIS", "0") in ("1", "true", "yes")
+
+# ------------------------
+# BATCH PROCESSING
+# ------------------------
+BATCH_WORKERS = int(os.getenv("DOCUSENSE_BATCH_WORKERS", "4"))
+
+# ------------------------
+# HTTP API
+# ------------------------
+# Requests executing at once; further requests wait in a bounded queue, then get 503
+API_MAX_INFLIGHT = int(os.getenv("DOCUSENSE_API_MAX_INFLIGHT", "8"))
+API_QUEUE_SIZE = int(os.getenv("DOCUSENSE_API_QUEUE_SIZE", "32"))
+API_QUEUE_TIMEOUT = float(os.getenv("DOCUSENSE_API_QUEUE_TIMEOUT", "30"))
+API_MAX_UPLOAD_MB = int(os.getenv("DOCUSENSE_API_MAX_UPLOAD_MB", "25"))
+
+# ------------------------
+# STARTUP
+# ------------------------
+WARMUP = os.getenv("DOCUSENSE_WARMUP", "1") not in ("0", "false", "no")
@@ -0,0 +1,83 @@
+"""Multi-document corpus: one shared collection searched with metadata filters.
+
+Every chunk carries ``doc_id``, ``filename``, ``doc_type``, ``uploaded_at`` and
+(when known) ``page`` next to its offsets. Queries turn the requested filters
+into a Chroma ``where`` clause, so the vector search only ranks chunks of the
+matching documents and its cost follows the filtered set, not the corpus size.
+"""
+import time
+
+from core import config
+from core.ingest import ingest_records
+from core.store import doc_lock
+
+
+def get_corpus(client, name=None):
+    return client.get_or_create_collection(name=name or config.CORPUS_COLLECTION)
+
+
+def in_corpus(collection, doc_id):
+    return bool(collection.get(where={"doc_id": doc_id}, limit=1, include=[])["ids"])
+
+
+def add_to_corpus(collection, doc_id, filename, doc_type, chunks, embedder, uploaded_at=None, batch_size=None):
+    """Add a document's chunk dicts to the corpus; returns ingest stats, or ``None`` if already present."""
+    with doc_lock(doc_id):
+        if in_corpus(collection, doc_id):
+            return None
+        base = {"doc_id": doc_id, "filename": filename, "doc_type": doc_type or "Unknown",
+                "uploaded_at": uploaded_at or time.time()}
+        records = ((f"{doc_id}-{c['index']}", c["text"], {**base, **{k: v for k, v in c.items() if k != "text"}})
+                   for c in chunks)
+        return ingest_records(collection, records, embedder, batch_size)
+
+
+def remove_from_corpus(collection, doc_id):
+    with doc_lock(doc_id):
+        collection.delete(where={"doc_id": doc_id})
+
+
+def list_documents(collection):
+    """One ``{doc_id, filename, doc_type, uploaded_at}`` row per document, newest first."""
+    got = collection.get(where={"index": 0}, include=["metadatas"])
+    rows = [{k: m.get(k) for k in ("doc_id", "filename", "doc_type", "uploaded_at")} for m in got["metadatas"]]
+    return sorted(rows, key=lambda r: -(r["uploaded_at"] or 0))
+
+
+def build_where(filenames=None, doc_types=None, doc_ids=None, pages=None, uploaded_after=None,
+                uploaded_before=None):
+    """Chroma ``where`` clause for the given filters, or ``None`` when unfiltered."""
+    clauses = []
+    for field, values in (("filename", filenames), ("doc_type", doc_types), ("doc_id", doc_ids), ("page", pages)):
+        if values:
+            values = list(values)
+            clauses.append({field: values[0]} if len(values) == 1 else {field: {"$in": values}})
+    if uploaded_after is not None:
+        clauses.append({"uploaded_at": {"$gte": uploaded_after}})
+    if uploaded_before is not None:
+        clauses.append({"uploaded_at": {"$lte": uploaded_before}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def search_corpus(collection, embedder, question, k=None, **filters):
+    """Top ``k`` chunks across the corpus as ``{"id", "text", "metadata", "distance"}`` dicts."""
+    k = k or config.CORPUS_TOP_K
+    kwargs = {"query_embeddings": [embedder.encode([question])[0].tolist()], "n_results": k,
+              "include": ["documents", "metadatas", "distances"]}
+    where = build_where(**filters)
+    if where is not None:
+        kwargs["where"] = where
+    try:
+        res = collection.query(**kwargs)
+    except ValueError:
+        # chromadb<0.5 raises ValueError for a collection deleted since it was fetched; anything else
+        # (a bad filter, a dimension mismatch) is a real error
+        try:
+            collection.count()
+        except ValueError:
+            return []
+        raise
+    return [{"id": i, "text": d, "metadata": m, "distance": round(dist, 4)}
+            for i, d, m, dist in zip(res["ids"][0], res["documents"][0], res["metadatas"][0], res["distances"][0])]
@@ -0,0 +1,71 @@
+"""Content-addressed embedding cache in front of a SentenceTransformer."""
+import hashlib
+
+import numpy as np
+
+# encode() options that change the vectors, with the values that leave them as the default
+_KEYED_OPTIONS = {"normalize_embeddings": False, "prompt_name": None, "prompt": None, "truncate_dim": None}
+# Options that do not affect the returned vectors
+_NEUTRAL_OPTIONS = {"show_progress_bar", "device", "convert_to_numpy"}
+
+
+def normalize_text(text):
+    return " ".join(text.split())
+
+
+def embedding_key(model_name, text, options=None):
+    if options:
+        # Vectors encoded with default options keep their original keys
+        model_name += "".join(f"|{k}={options[k]}" for k in sorted(options))
+    return f"{model_name}:{hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()}"
+
+
+class CachedEmbedder:
+    """Drop-in for ``SentenceTransformer.encode`` that only encodes texts it hasn't seen.
+
+    Vectors are stored in ``store`` (a :class:`core.kvstore.KVStore`) as raw
+    ``dtype`` bytes keyed by ``(model_name, hash of normalized text)`` plus any
+    non-default option that changes the vectors (``normalize_embeddings``,
+    ``prompt``, ``prompt_name``, ``truncate_dim``). Other options that would
+    change the output, such as ``output_value`` or ``precision``, raise
+    ``TypeError``.
+    """
+
+    def __init__(self, model, model_name, store, dtype="float16"):
+        self.model = model
+        self.model_name = model_name
+        self.store = store
+        self.dtype = np.dtype(dtype)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        unsupported = set(kwargs) - _KEYED_OPTIONS.keys() - _NEUTRAL_OPTIONS
+        if unsupported:
+            raise TypeError(f"CachedEmbedder.encode() got unsupported option(s): {', '.join(sorted(unsupported))}")
+        options = {k: v for k, v in kwargs.items() if k in _KEYED_OPTIONS and v != _KEYED_OPTIONS[k]}
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        keys = [embedding_key(self.model_name, t, options) for t in texts]
+        cached = self.store.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = self.model.encode(list(missing.values()), batch_size=batch_size, **kwargs)
+            fresh = {k: np.asarray(v, dtype=np.float32) for k, v in zip(missing, vectors)}
+            self.store.put_many({k: v.astype(self.dtype).tobytes() for k, v in fresh.items()})
+        else:
+            fresh = {}
+
+        rows = [fresh[k] if k in fresh else np.frombuffer(cached[k], dtype=self.dtype).astype(np.float32)
+                for k in keys]
+        result = np.vstack(rows) if rows else np.zeros(
+            (0, options.get("truncate_dim") or self.model.get_sentence_embedding_dimension()), np.float32)
+        return result[0] if single else result
+
+    def stats(self):
+        return self.store.stats()
@@ -0,0 +1,62 @@
+"""Embedding model loading: PyTorch float32, dynamically quantized int8, or ONNX Runtime.
+
+The three backends produce vectors that agree within a small tolerance
+(``scripts/bench_embeddings.py`` checks retrieval quality and throughput) but
+are not bit-identical, so cached vectors are keyed by
+:func:`embedding_model_id` rather than the model name alone.
+"""
+import os
+
+from core import config
+
+BACKENDS = ("torch", "int8", "onnx")
+
+
+def embedding_model_id(name=None, backend=None, onnx_file=None):
+    name = name or config.EMBED_MODEL
+    backend = backend or config.EMBED_BACKEND
+    onnx_file = config.EMBED_ONNX_FILE if onnx_file is None else onnx_file
+    if backend == "torch":
+        return name  # keeps vectors cached before backends existed valid
+    if backend == "onnx" and onnx_file:
+        return f"{name}@onnx/{os.path.basename(onnx_file)}"
+    return f"{name}@{backend}"
+
+
+def load_embedding_model(name=None, backend=None, threads=None, onnx_file=None):
+    """A ``SentenceTransformer`` for ``name`` running on ``backend``.
+
+    ``threads`` limits CPU threads for encoding (0 = the library default). For
+    torch this is process-wide; ONNX Runtime sets it per session. ``onnx_file``
+    selects an export inside the model repo, e.g. a pre-quantized
+    ``onnx/model_qint8_avx512_vnni.onnx`` (default ``onnx/model.onnx``).
+    """
+    name = name or config.EMBED_MODEL
+    backend = backend or config.EMBED_BACKEND
+    threads = config.EMBED_THREADS if threads is None else threads
+    onnx_file = config.EMBED_ONNX_FILE if onnx_file is None else onnx_file
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "onnx":
+        # Needs sentence-transformers>=3.2 and optimum[onnxruntime]
+        model_kwargs = {}
+        if onnx_file:
+            model_kwargs["file_name"] = onnx_file
+        if threads:
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+            model_kwargs["session_options"] = options
+        return SentenceTransformer(name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+    import torch
+    if threads:
+        torch.set_num_threads(threads)
+    if backend == "torch":
+        return SentenceTransformer(name)
+    # Linear layers carry nearly all of MiniLM's FLOPs; weights go to int8, activations are quantized per batch
+    model = SentenceTransformer(name, device="cpu")
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
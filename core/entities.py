@@ -0,0 +1,95 @@
+"""Entity extraction: contact details by regex, spaCy NER, and LLM skills for resumes."""
+import re
+
+from core.ner import extract_ner, get_ner_pipeline, resolve_model
+from core.patterns import CONTACT_PATTERNS, context_snippet
+from core.store import doc_id_for
+
+ENTITY_DESCRIPTIONS = {
+    "PERSON": "👤 Person name", "ORG": "🏢 Organization",
+    "GPE": "📍 Location", "DATE": "📅 Date",
+    "MONEY": "💰 Monetary value", "PERCENT": "📊 Percentage",
+    "TIME": "⏰ Time", "CARDINAL": "🔢 Number",
+    "EMAIL": "📧 Email", "PHONE": "📞 Phone",
+    "URL": "🔗 URL", "SKILL": "💡 Skill",
+    "INVOICE_NUMBER": "🧾 Invoice No.", "QUANTITY": "📏 Quantity"
+}
+
+# Bump whenever extract_enhanced_entities or its helpers change output
+ENTITY_PIPELINE_VERSION = "4"
+
+
+def get_entity_description(label):
+    return ENTITY_DESCRIPTIONS.get(label, label)
+
+
+def entities_key(text, doc_type):
+    # Includes the routed NER model, so changing the routes invalidates cached tables
+    return f"{doc_id_for(text)}:{doc_type}:{resolve_model(doc_type)}:{ENTITY_PIPELINE_VERSION}"
+
+
+def extract_pattern_entities(text, extractor=CONTACT_PATTERNS, spans=None):
+    """Entity rows for regex-detected types (emails, phones, URLs, invoice numbers, ...)."""
+    rows = []
+    for m in extractor.extract(text, spans):
+        value = m.value[:50] if m.label == "URL" else m.value
+        rows.append({"Entity": value, "Type": m.label, "Description": get_entity_description(m.label),
+                     "Context": context_snippet(text, m.start, m.end)})
+    # Contact details first, as the table always listed them; document order within a type
+    order = {"EMAIL": 0, "PHONE": 1, "URL": 2}
+    return sorted(rows, key=lambda r: order.get(r["Type"], len(order)))
+
+
+def extract_skills_with_llm(text, llm):
+    try:
+        content = llm.complete(
+            f"Extract professional skills from this resume as comma-separated list only:\n{text[:2000]}",
+            temperature=0.1, max_tokens=200
+        )
+        return [s.strip() for s in content.split(',') if s.strip()][:10]
+    except Exception:
+        return []
+
+
+def extract_enhanced_entities(text, doc_type, llm=None, nlp=None):
+    """Entity rows (``Entity``, ``Type``, ``Description``, ``Context``) for ``text``.
+
+    ``nlp`` defaults to the spaCy model routed for ``doc_type``. ``llm`` is only
+    used for resume skills; without it that step is skipped.
+    """
+    nlp = nlp or get_ner_pipeline(doc_type)
+    entities = []
+    seen = set()
+
+    spans = []
+    for row in extract_pattern_entities(text, spans=spans):
+        if row["Entity"] not in seen:
+            entities.append(row)
+            seen.add(row["Entity"])
+
+    for ent in extract_ner([text], nlp)[0]:
+        t = ent.text.strip()
+        if not t or t in seen or len(t) <= 1:
+            continue
+        # Phone numbers and ids are often also tagged CARDINAL; the pattern match wins
+        if any(ent.start < end and start < ent.end for start, end in spans):
+            continue
+        if ent.label == "DATE" and re.match(r'^[\d\s\-\.()]+$', t):
+            continue
+        etype = ent.label
+        if etype == "GPE" and t.isupper() and len(t) > 3:
+            etype = "PERSON"
+        if etype == "ORG" and ("resume" in doc_type.lower() or "cv" in doc_type.lower()):
+            if any(k in t.lower() for k in ["management", "planning", "service", "operations", "strategic", "excellence"]):
+                etype = "SKILL"
+        entities.append({"Entity": t, "Type": etype, "Description": get_entity_description(etype),
+                        "Context": ent.context[:80] + "..." if len(ent.context) > 80 else ent.context})
+        seen.add(t)
+
+    if llm is not None and ("resume" in doc_type.lower() or "cv" in doc_type.lower()):
+        for skill in extract_skills_with_llm(text, llm):
+            if skill not in seen:
+                entities.append({"Entity": skill, "Type": "SKILL", "Description": get_entity_description("SKILL"), "Context": "Professional skill"})
+                seen.add(skill)
+
+    return entities
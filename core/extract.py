@@ -0,0 +1,96 @@
+"""Page-level text extraction.
+
+PDF pages are extracted in a process pool, a few pages per task, and yielded
+in page order as soon as each task finishes, so chunking and embedding can
+start before the last page is done.
+"""
+import io
+import os
+import tempfile
+import time
+
+from core import config
+
+try:
+    import PyPDF2
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+try:
+    import docx
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+
+
+def _page(number, total, text, seconds):
+    return {"page": number, "pages": total, "text": text, "seconds": round(seconds, 4)}
+
+
+def _extract_range(path, start, stop):
+    # Runs in a worker process; each worker opens its own reader
+    reader = PyPDF2.PdfReader(path)
+    total = len(reader.pages)
+    pages = []
+    for i in range(start, stop):
+        t = time.perf_counter()
+        text = reader.pages[i].extract_text() or ""
+        pages.append(_page(i + 1, total, text, time.perf_counter() - t))
+    return pages
+
+
+def iter_pdf_pages(data, pool=None, pages_per_task=None):
+    if not PDF_AVAILABLE:
+        raise RuntimeError("PyPDF2 not installed. Run: pip install PyPDF2")
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    total = len(reader.pages)
+
+    if pool is None or total < config.PDF_PARALLEL_MIN_PAGES:
+        for i, page in enumerate(reader.pages):
+            t = time.perf_counter()
+            text = page.extract_text() or ""
+            yield _page(i + 1, total, text, time.perf_counter() - t)
+        return
+
+    step = pages_per_task or config.PDF_PAGES_PER_TASK
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    futures = []
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        futures = [pool.submit(_extract_range, path, i, min(i + step, total)) for i in range(0, total, step)]
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        for future in futures:
+            if not future.cancelled():
+                try:
+                    future.exception()
+                except Exception:
+                    pass
+        os.remove(path)
+
+
+def iter_pages(filename, data, pool=None):
+    """Yield ``{"page", "pages", "text", "seconds"}`` for an uploaded file's bytes."""
+    if filename.endswith(".pdf"):
+        yield from iter_pdf_pages(data, pool)
+        return
+    t = time.perf_counter()
+    if filename.endswith(".docx"):
+        if not DOCX_AVAILABLE:
+            raise RuntimeError("python-docx not installed. Run: pip install python-docx")
+        document = docx.Document(io.BytesIO(data))
+        text = "\n".join([p.text for p in document.paragraphs if p.text.strip()])
+    else:
+        text = data.decode("utf-8")
+    yield _page(1, 1, text, time.perf_counter() - t)
+
+
+def extract_text(filename, data, pool=None):
+    """Whole-document text and page count for a file's bytes."""
+    pages = list(iter_pages(filename, data, pool))
+    return "\n".join(p["text"] for p in pages if p["text"]), len(pages)
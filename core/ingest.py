@@ -0,0 +1,70 @@
+"""Batched embedding + bulk upsert shared by the app and the rag scripts."""
+import time
+from itertools import count, islice, repeat
+
+from core import config
+
+
+def _batches(iterable, size):
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def ingest_records(collection, records, embedder, batch_size=None, known=None):
+    """Encode and upsert ``(id, text, metadata)`` records in batches.
+
+    ``records`` may be a generator; it is consumed once, one batch at a time,
+    so ingestion can start before the producer (e.g. PDF extraction) is done.
+    ``known`` maps a batch's ids to embeddings already stored for them; those
+    records are upserted without being encoded again. Returns throughput stats.
+    """
+    batch_size = batch_size or config.INGEST_BATCH_SIZE
+    total = reused = 0
+    encode_seconds = 0.0
+    start = time.perf_counter()
+    for batch in _batches(records, batch_size):
+        batch_ids = [b[0] for b in batch]
+        batch_docs = [b[1] for b in batch]
+        batch_meta = [b[2] for b in batch]
+
+        found = known(batch_ids) if known is not None else {}
+        missing = [i for i, id_ in enumerate(batch_ids) if id_ not in found]
+        embeddings = [found.get(id_) for id_ in batch_ids]
+        if missing:
+            t = time.perf_counter()
+            encoded = embedder.encode([batch_docs[i] for i in missing], batch_size=batch_size)
+            encode_seconds += time.perf_counter() - t
+            for i, e in zip(missing, encoded):
+                embeddings[i] = e.tolist()
+        reused += len(batch) - len(missing)
+
+        kwargs = {"ids": batch_ids, "documents": batch_docs, "embeddings": embeddings}
+        if any(m is not None for m in batch_meta):
+            kwargs["metadatas"] = batch_meta
+        collection.upsert(**kwargs)
+        total += len(batch)
+
+    seconds = time.perf_counter() - start
+    return {
+        "chunks": total,
+        "embedded": total - reused,
+        "reused": reused,
+        "seconds": round(seconds, 3),
+        "encode_seconds": round(encode_seconds, 3),
+        "chunks_per_sec": round(total / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+def ingest_chunks(collection, chunks, embedder, ids=None, metadatas=None, batch_size=None):
+    """Encode ``chunks`` in batches and upsert each batch with a single call.
+
+    ``chunks``, ``ids`` and ``metadatas`` may be any iterables; ids default to
+    the chunk position.
+    """
+    ids = ids if ids is not None else (str(i) for i in count())
+    metadatas = metadatas if metadatas is not None else repeat(None)
+    return ingest_records(collection, zip(ids, chunks, metadatas), embedder, batch_size)
@@ -0,0 +1,138 @@
+"""Small SQLite-backed key/value store with LRU eviction, used by the on-disk caches."""
+import os
+import sqlite3
+import threading
+import time
+
+# Puts between full recounts of the table; the running totals in between miss other processes' writes
+RECOUNT_EVERY = 1000
+
+
+class KVStore:
+    def __init__(self, path, max_bytes=None, max_entries=None, ttl=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS kv (
+            key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,
+            created REAL NOT NULL, accessed REAL NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS kv_accessed ON kv (accessed)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS kv_created ON kv (created)")
+        # Running entry count and size, so a put does not scan the table to decide on eviction
+        self._recount()
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                rows = self._db.execute(
+                    f"SELECT key, value, created FROM kv WHERE key IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                for key, value, created in rows:
+                    if self.ttl is not None and now - created > self.ttl:
+                        continue
+                    found[key] = value
+            if found:
+                self._db.executemany("UPDATE kv SET accessed = ? WHERE key = ?", [(now, k) for k in found])
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, key, value):
+        self.put_many({key: value})
+
+    def put_many(self, items):
+        now = time.time()
+        rows = [(k, v, len(v), now, now) for k, v in items.items()]
+        if not rows:
+            return
+        with self._lock:
+            self._db.execute("BEGIN")
+            replaced = self._sizes([row[0] for row in rows])
+            self._db.executemany("INSERT OR REPLACE INTO kv VALUES (?, ?, ?, ?, ?)", rows)
+            self._db.execute("COMMIT")
+            self._entries += len(rows) - len(replaced)
+            self._bytes += sum(row[2] for row in rows) - sum(replaced.values())
+            self._puts += 1
+            if self._puts >= RECOUNT_EVERY:
+                self._recount()
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            size = self._sizes([key]).get(key)
+            if size is not None:
+                self._db.execute("DELETE FROM kv WHERE key = ?", (key,))
+                self._entries -= 1
+                self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM kv")
+            self._entries = self._bytes = 0
+
+    def _recount(self):
+        self._entries, self._bytes = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM kv").fetchone()
+        self._puts = 0
+
+    def _sizes(self, keys):
+        sizes = {}
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            sizes.update(self._db.execute(
+                f"SELECT key, size FROM kv WHERE key IN ({','.join('?' * len(part))})", part).fetchall())
+        return sizes
+
+    def _evict(self):
+        if self.ttl is not None:
+            cutoff = time.time() - self.ttl
+            expired, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM kv WHERE created < ?", (cutoff,)).fetchone()
+            if expired:
+                self._db.execute("DELETE FROM kv WHERE created < ?", (cutoff,))
+                self._entries -= expired
+                self._bytes -= size
+        over_entries = self._entries - self.max_entries if self.max_entries else 0
+        over_bytes = self._bytes - self.max_bytes if self.max_bytes else 0
+        if over_entries <= 0 and over_bytes <= 0:
+            return
+        victims, evicted_bytes = [], 0
+        for key, size in self._db.execute("SELECT key, size FROM kv ORDER BY accessed"):
+            if over_entries <= 0 and over_bytes <= 0:
+                break
+            victims.append((key,))
+            evicted_bytes += size
+            over_entries -= 1
+            over_bytes -= size
+        self._db.executemany("DELETE FROM kv WHERE key = ?", victims)
+        self._entries = max(0, self._entries - len(victims))
+        self._bytes = max(0, self._bytes - evicted_bytes)
+        self.evictions += len(victims)
+
+    def stats(self):
+        with self._lock:
+            count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM kv").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,152 @@
+"""Single entry point for Groq chat completions, with a deterministic response cache."""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from core import config
+from core.metrics import percentile
+
+logger = logging.getLogger("docusense.llm")
+
+
+def cache_key(model, prompt, temperature, max_tokens):
+    payload = json.dumps([model, prompt, temperature, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMGateway:
+    """Wraps ``client.chat.completions.create`` behind ``complete()`` and ``stream()``.
+
+    ``client`` may be a Groq client or a zero-argument callable returning one,
+    so the (possibly slow) client construction stays lazy. ``store`` is an
+    optional :class:`core.kvstore.KVStore`; without it every call goes out.
+    """
+
+    def __init__(self, client, store=None, model=None, max_concurrency=None):
+        self._client = client
+        self.store = store
+        self.model = model or config.LLM_MODEL
+        # Process-wide cap on in-flight requests, shared by every session and worker thread
+        self._slots = threading.BoundedSemaphore(max_concurrency or config.LLM_MAX_CONCURRENCY)
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.tokens_used = 0
+        self.tokens_saved = 0
+        # Recent per-request latency records (time to first token, total), newest last
+        self.latencies = deque(maxlen=config.LLM_METRICS_WINDOW)
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if callable(self._client) and not hasattr(self._client, "chat"):
+            self._client = self._client()
+        return self._client
+
+    def _cached(self, key):
+        if self.store is None:
+            return None
+        cached = self.store.get(key)
+        if cached is None:
+            return None
+        entry = json.loads(cached)
+        with self._lock:
+            self.hits += 1
+            self.tokens_saved += entry.get("tokens", 0)
+        return entry["content"]
+
+    def _record(self, key, content, tokens, use_cache, started, first_token_at, cached=False):
+        now = time.perf_counter()
+        metric = {
+            "ttft_ms": round((first_token_at - started) * 1000, 1),
+            "total_ms": round((now - started) * 1000, 1),
+            "cached": cached,
+            "tokens": tokens,
+        }
+        with self._lock:
+            self.latencies.append(metric)
+            if not cached:
+                self.calls += 1
+                self.misses += 1
+                self.tokens_used += tokens
+        logger.info("llm request ttft_ms=%s total_ms=%s cached=%s tokens=%s",
+                    metric["ttft_ms"], metric["total_ms"], cached, tokens)
+        if not cached and use_cache and self.store is not None and content:
+            self.store.put(key, json.dumps({"content": content, "tokens": tokens}).encode("utf-8"))
+
+    def complete(self, prompt, temperature=0.3, max_tokens=500, model=None, use_cache=True):
+        model = model or self.model
+        key = cache_key(model, prompt, temperature, max_tokens)
+        started = time.perf_counter()
+        content = self._cached(key) if use_cache else None
+        if content is not None:
+            self._record(key, content, 0, use_cache, started, time.perf_counter(), cached=True)
+            return content
+
+        with self._slots:
+            chat = self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+        content = chat.choices[0].message.content
+        tokens = getattr(getattr(chat, "usage", None), "total_tokens", 0) or 0
+        # Without streaming the first token arrives with the last one
+        self._record(key, content, tokens, use_cache, started, time.perf_counter())
+        return content
+
+    def stream(self, prompt, temperature=0.3, max_tokens=500, model=None, use_cache=True):
+        """Yield the completion as text deltas; a cached answer is yielded in one piece."""
+        model = model or self.model
+        key = cache_key(model, prompt, temperature, max_tokens)
+        started = time.perf_counter()
+        content = self._cached(key) if use_cache else None
+        if content is not None:
+            self._record(key, content, 0, use_cache, started, time.perf_counter(), cached=True)
+            yield content
+            return
+
+        parts, tokens, first_token_at = [], 0, None
+        with self._slots:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            for chunk in response:
+                # Groq reports usage on the final chunk under x_groq
+                usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or getattr(chunk, "usage", None)
+                if usage is not None:
+                    tokens = getattr(usage, "total_tokens", 0) or 0
+                if not chunk.choices:
+                    continue
+                delta = getattr(chunk.choices[0].delta, "content", None)
+                if delta:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    parts.append(delta)
+                    yield delta
+        self._record(key, "".join(parts), tokens, use_cache, started, first_token_at or time.perf_counter())
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        with self._lock:
+            live = [m for m in self.latencies if not m["cached"]]
+        return {
+            "calls": self.calls,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "tokens_used": self.tokens_used,
+            "tokens_saved": self.tokens_saved,
+            "p50_ttft_ms": percentile([m["ttft_ms"] for m in live], 50),
+            "p95_ttft_ms": percentile([m["ttft_ms"] for m in live], 95),
+            "p50_total_ms": percentile([m["total_ms"] for m in live], 50),
+            "p95_total_ms": percentile([m["total_ms"] for m in live], 95),
+        }
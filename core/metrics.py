@@ -0,0 +1,9 @@
+"""Small statistics helpers shared by the stats endpoints and the benchmark scripts."""
+
+
+def percentile(values, pct):
+    """Nearest-rank ``pct``th percentile of ``values`` (0.0 when empty)."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
@@ -0,0 +1,99 @@
+"""Batched named-entity recognition.
+
+Only ``ner`` (and whatever embedding layer it listens to) is kept from the
+spaCy pipeline; a rule-based ``sentencizer`` replaces the dependency parser
+for context sentences. Documents are cut into paragraph-aligned blocks that
+run through ``nlp.pipe`` in batches (optionally across processes), so long
+documents never hit ``nlp.max_length``, and entity offsets are mapped back to
+the full text.
+
+Each document type is routed to a spaCy model (the base model or a custom
+one such as ``models/ner_model``); routed models are loaded on first use and
+kept resident in the registry.
+"""
+import functools
+import json
+import os
+from collections import namedtuple
+
+from core import config
+
+# Components en_core_web_sm ships that NER does not need
+UNUSED_COMPONENTS = ("tagger", "parser", "senter", "lemmatizer", "attribute_ruler", "morphologizer")
+
+Entity = namedtuple("Entity", "text label start end context")
+
+# Tags of the GMB corpus the custom model is trained on (train_ner.py) -> spaCy's labels
+LABEL_MAP = {"per": "PERSON", "org": "ORG", "geo": "GPE", "gpe": "GPE", "tim": "DATE",
+             "art": "WORK_OF_ART", "eve": "EVENT", "nat": "NORP"}
+
+
+@functools.lru_cache(maxsize=1)
+def load_routes():
+    """Document type -> model, from the routes file then ``DOCUSENSE_NER_ROUTES`` (JSON) overrides."""
+    routes = {}
+    if os.path.exists(config.NER_ROUTES_FILE):
+        with open(config.NER_ROUTES_FILE) as f:
+            routes.update(json.load(f))
+    if config.NER_ROUTES:
+        routes.update(json.loads(config.NER_ROUTES))
+    return routes
+
+
+def resolve_model(doc_type, routes=None):
+    """Model name or path for ``doc_type``; the base model when the routed one is not on disk."""
+    routes = load_routes() if routes is None else routes
+    name = routes.get(doc_type) or routes.get("default") or config.SPACY_MODEL
+    if (os.sep in name or name.startswith(".")) and not os.path.isdir(name):
+        return config.SPACY_MODEL
+    return name
+
+
+def get_ner_pipeline(doc_type=None):
+    from core.registry import registry
+    name = resolve_model(doc_type)
+    if name == config.SPACY_MODEL:
+        return registry.get("nlp")
+    registry.register(f"nlp:{name}", lambda: load_ner_pipeline(name))
+    return registry.get(f"nlp:{name}")
+
+
+def load_ner_pipeline(name):
+    import spacy
+    nlp = spacy.load(name, exclude=list(UNUSED_COMPONENTS))
+    if "tok2vec" in nlp.pipe_names and not getattr(nlp.get_pipe("tok2vec"), "listening_components", None):
+        # ner has its own embedding layer in the small English models
+        nlp.remove_pipe("tok2vec")
+    if "sentencizer" not in nlp.pipe_names:
+        nlp.add_pipe("sentencizer", first=True)
+    return nlp
+
+
+def iter_blocks(text, max_chars=None):
+    """Yield ``(offset, block)`` pairs of at most ``max_chars``, cut at line breaks where possible."""
+    max_chars = max_chars or config.NER_BLOCK_CHARS
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            cut = text.rfind("\n", start, end)
+            if cut <= start:
+                cut = text.rfind(" ", start, end)
+            if cut > start:
+                end = cut + 1
+        yield start, text[start:end]
+        start = end
+
+
+def extract_ner(texts, nlp, batch_size=None, n_process=None, block_chars=None):
+    """Entities for each text in ``texts``, as lists of :class:`Entity` with document offsets."""
+    texts = list(texts)
+    blocks = [(i, offset, block) for i, text in enumerate(texts) for offset, block in iter_blocks(text, block_chars)]
+    results = [[] for _ in texts]
+    docs = nlp.pipe((b[2] for b in blocks), batch_size=batch_size or config.NER_BATCH_SIZE,
+                    n_process=n_process or config.NER_PROCESSES)
+    for (i, offset, _), doc in zip(blocks, docs):
+        for ent in doc.ents:
+            results[i].append(Entity(ent.text, LABEL_MAP.get(ent.label_, ent.label_), offset + ent.start_char,
+                                     offset + ent.end_char, ent.sent.text))
+    return results
@@ -0,0 +1,62 @@
+"""The labelled NER dataset (data/ner/ner_dataset.csv) shared by training and evaluation.
+
+The CSV is the Kaggle GMB corpus: one word per row with IOB tags such as
+``B-geo`` / ``I-per``. Sentences end at ``"."``; entity offsets refer to the
+words joined with single spaces.
+"""
+import random
+
+DATASET = "data/ner/ner_dataset.csv"
+TEST_FRACTION = 0.2
+SPLIT_SEED = 42
+
+
+def load_dataset(path=DATASET):
+    """``[(text, {"entities": [(start, end, label), ...]}), ...]`` in file order."""
+    import pandas as pd
+    df = pd.read_csv(path, encoding="latin1")
+
+    df = df.ffill()
+
+    sentences = []
+    entities = []
+    current_words = []
+    current_tags = []
+
+    for word, tag in zip(df["Word"], df["Tag"]):
+        current_words.append(word)
+        current_tags.append(tag)
+
+        if word == ".":
+            sentences.append(current_words)
+            entities.append(current_tags)
+            current_words = []
+            current_tags = []
+
+    data = []
+
+    for words, tags in zip(sentences, entities):
+        text = " ".join(words)
+        ents = []
+        start = 0
+
+        for word, tag in zip(words, tags):
+            end = start + len(word)
+
+            if tag != "O":
+                label = tag.split("-")[-1]
+                ents.append((start, end, label))
+
+            start = end + 1
+
+        data.append((text, {"entities": ents}))
+    return data
+
+
+def split_dataset(data, test_fraction=TEST_FRACTION, seed=SPLIT_SEED):
+    """Deterministic ``(train, test)`` split, so evaluation never sees training sentences."""
+    order = list(range(len(data)))
+    random.Random(seed).shuffle(order)
+    n_test = int(len(data) * test_fraction)
+    test = set(order[:n_test])
+    return [d for i, d in enumerate(data) if i not in test], [data[i] for i in sorted(test)]
@@ -0,0 +1,104 @@
+"""Single-pass pattern extraction for contact details and document identifiers.
+
+All patterns are compiled once into one alternation of named groups, so a
+document is scanned a single time whatever the number of entity types. Each
+match keeps its span; values are normalised per type and deduplicated on the
+normalised key (``+91 98765 43210`` and ``9876543210`` are one phone) and
+shown as first written.
+New types are added with :meth:`PatternExtractor.register`.
+"""
+import re
+from collections import namedtuple
+
+PatternMatch = namedtuple("PatternMatch", "label value start end")
+
+# Longest / most specific phone shapes first: +91, (xxx) xxx-xxxx, 5+5 and 3-3-4 digits
+PHONE = (r"(?<![\w+])(?:\+91[-. \t]?\d{5}[ \t]?\d{5}|\(\d{3}\)[ \t]*\d{3}[-. \t]?\d{4}"
+         r"|\d{5}[ \t]?\d{5}|\d{3}[-. \t]?\d{3}[-. \t]?\d{4})(?![\w])")
+EMAIL = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"
+URL = r"https?://[^\s<>\"']+|www\.[^\s<>\"']+"
+# "INV-2024-0001" or a labelled number such as "Invoice No: 4471/B"; the value must contain a digit
+INVOICE_NUMBER = (r"\bINV[-/]?\d[\w/-]*"
+                  r"|(?i:\binvoice[ \t]*(?:no\.?|number|num|#)[ \t]*[:#]?[ \t]*)(?P<INVOICE_NUMBER_v>(?=[\w/-]*\d)[A-Za-z0-9][\w/-]+)")
+
+
+def normalize_phone(value):
+    digits = re.sub(r"\D", "", value)
+    if value.lstrip().startswith("+91") and len(digits) == 12:
+        return digits[2:], "+91 " + digits[2:]
+    return digits[-10:], value.strip()
+
+
+def normalize_url(value):
+    value = value.rstrip(".,;:)]}'\"")
+    return value.lower(), value
+
+
+class PatternExtractor:
+    def __init__(self):
+        self._patterns = {}
+        self._normalizers = {}
+        self._compiled = None
+
+    def register(self, label, pattern, normalize=None):
+        """Add an entity type; ``normalize(value)`` returns ``(dedupe_key, display_value)``.
+
+        A named group ``<label>_v`` inside ``pattern`` selects the reported value.
+        Types registered earlier win when two patterns match at the same position.
+        """
+        self._patterns[label] = pattern
+        if normalize:
+            self._normalizers[label] = normalize
+        self._compiled = None
+        return self
+
+    @property
+    def labels(self):
+        return list(self._patterns)
+
+    @property
+    def compiled(self):
+        if self._compiled is None:
+            self._compiled = re.compile("|".join(f"(?P<{label}>{p})" for label, p in self._patterns.items()))
+        return self._compiled
+
+    def finditer(self, text):
+        for m in self.compiled.finditer(text):
+            # The outer group closes last, so this is the type even when a <label>_v group matched
+            label = m.lastgroup
+            group = f"{label}_v" if m.groupdict().get(f"{label}_v") is not None else label
+            yield PatternMatch(label, m.group(group), m.start(group), m.end(group))
+
+    def extract(self, text, spans=None):
+        """Deduplicated matches (first occurrence of each normalised value) in document order.
+
+        If a ``spans`` list is given, the ``(start, end)`` of every match, duplicates included, is appended.
+        """
+        seen, found = set(), []
+        for match in self.finditer(text):
+            if spans is not None:
+                spans.append((match.start, match.end))
+            normalize = self._normalizers.get(match.label)
+            key, value = normalize(match.value) if normalize else (match.value, match.value)
+            if (match.label, key) in seen:
+                continue
+            seen.add((match.label, key))
+            found.append(match._replace(value=value))
+        return found
+
+
+def context_snippet(text, start, end, width=80):
+    """The line around ``text[start:end]``, trimmed to about ``width`` characters."""
+    line_start = text.rfind("\n", 0, start) + 1
+    line_end = text.find("\n", end)
+    line_end = len(text) if line_end == -1 else line_end
+    left = max(line_start, min(start - (width - (end - start)) // 2, line_end - width))
+    snippet = text[left:min(line_end, left + width)].strip()
+    return ("..." if left > line_start else "") + snippet + ("..." if left + width < line_end else "")
+
+
+CONTACT_PATTERNS = (PatternExtractor()
+                    .register("EMAIL", EMAIL, lambda v: (v.lower(), v))
+                    .register("URL", URL, normalize_url)
+                    .register("INVOICE_NUMBER", INVOICE_NUMBER, lambda v: (v.upper(), v))
+                    .register("PHONE", PHONE, normalize_phone))
@@ -0,0 +1,102 @@
+"""Concurrent analysis of a newly uploaded document.
+
+Extraction + embedding, classification and the follow-up analyses run as
+asyncio tasks over worker threads:
+
+* pages stream into ``index`` (extraction and embedding overlap, see core.extract);
+* ``classify`` starts as soon as enough leading text has been extracted;
+* follow-ups (entities, optional risk / analysis prefetch) start once both
+  the full text and the document type are known.
+
+Callbacks run on the event-loop thread, i.e. the thread that called
+:func:`run_document_pipeline`, so they may safely touch UI or session state;
+the step functions themselves run in worker threads and must not.
+LLM concurrency is bounded by :class:`core.llm.LLMGateway`.
+"""
+import asyncio
+import time
+
+from core import config
+
+
+def _resolve(future, value=None):
+    if not future.done():
+        future.set_result(value)
+
+
+async def _step(name, fn, *args, results, errors, on_result):
+    start = time.perf_counter()
+    try:
+        value = await asyncio.to_thread(fn, *args)
+    except Exception as e:
+        errors[name] = e
+        value = None
+    else:
+        results[name] = value
+    if on_result:
+        on_result(name, value, round(time.perf_counter() - start, 3), errors.get(name))
+    return value
+
+
+async def analyse_document(pages, index, classify, followups=None, on_result=None, on_page=None,
+                           prefix_chars=None):
+    """Run the upload pipeline; returns ``(results, errors)`` keyed by step name.
+
+    ``index(pages)`` consumes the page iterator, ``classify(text)`` returns the
+    document type and each ``followups[name](text, doc_type)`` runs afterwards.
+    The joined document text is reported as step ``"text"``.
+    """
+    loop = asyncio.get_running_loop()
+    prefix_chars = prefix_chars or max(config.CLASSIFIER_CHARS, 1500)
+    prefix_ready = loop.create_future()
+    collected = []
+    results, errors = {}, {}
+
+    def tap(pages):
+        # Runs in the index worker thread
+        size = 0
+        for page in pages:
+            collected.append(page)
+            size += len(page["text"])
+            if on_page:
+                loop.call_soon_threadsafe(on_page, page)
+            if size >= prefix_chars:
+                loop.call_soon_threadsafe(_resolve, prefix_ready)
+            yield page
+
+    def joined(pages):
+        return "\n".join(p["text"] for p in pages if p["text"])
+
+    async def classify_when_ready():
+        await prefix_ready
+        text = joined(list(collected))
+        if not text:
+            return None
+        return await _step("classify", classify, text, results=results, errors=errors, on_result=on_result)
+
+    index_task = asyncio.create_task(
+        _step("index", index, tap(pages), results=results, errors=errors, on_result=on_result))
+    classify_task = asyncio.create_task(classify_when_ready())
+
+    await index_task
+    _resolve(prefix_ready)
+    text = joined(collected)
+    results["text"] = text
+    if on_result:
+        on_result("text", text, 0.0, errors.get("index"))
+    if "index" in errors or not text:
+        classify_task.cancel()
+        return results, errors
+
+    doc_type = await classify_task
+    if doc_type is None:
+        return results, errors
+    await asyncio.gather(*[
+        _step(name, fn, text, doc_type, results=results, errors=errors, on_result=on_result)
+        for name, fn in (followups or {}).items()
+    ])
+    return results, errors
+
+
+def run_document_pipeline(*args, **kwargs):
+    return asyncio.run(analyse_document(*args, **kwargs))
@@ -0,0 +1,191 @@
+"""Process-wide registry of heavy models and clients.
+
+Streamlit re-executes app.py on every interaction, but imported modules stay in
+``sys.modules``, so anything held here is loaded once per server process and
+shared by every session.
+"""
+import os
+import threading
+import time
+
+from core import config
+
+
+def _rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders = {}
+        self._objects = {}
+        self._stats = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._warmup_started = False
+
+    def register(self, name, loader):
+        # First registration wins so re-running a script doesn't swap loaders
+        with self._lock:
+            if name not in self._loaders:
+                self._loaders[name] = loader
+                self._locks[name] = threading.Lock()
+
+    def is_loaded(self, name):
+        return name in self._objects
+
+    def get(self, name):
+        if name in self._objects:
+            return self._objects[name]
+        if name not in self._loaders:
+            raise KeyError(f"No loader registered for '{name}'")
+        with self._locks[name]:
+            if name not in self._objects:
+                rss_before = _rss_mb()
+                start = time.perf_counter()
+                obj = self._loaders[name]()
+                self._stats[name] = {
+                    "load_seconds": round(time.perf_counter() - start, 3),
+                    "rss_delta_mb": round(_rss_mb() - rss_before, 1),
+                    "loaded_at": time.time(),
+                }
+                self._objects[name] = obj
+        return self._objects[name]
+
+    def stats(self):
+        return {name: dict(s) for name, s in self._stats.items()}
+
+    def warmup(self, names=None, background=True):
+        with self._lock:
+            if self._warmup_started:
+                return None
+            self._warmup_started = True
+        names = list(names or self._loaders)
+
+        def _run():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    self._stats[name] = {"error": str(e)}
+
+        if not background:
+            _run()
+            return None
+        thread = threading.Thread(target=_run, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+
+# ------------------------
+# DEFAULT LOADERS
+# ------------------------
+def _load_nlp():
+    from core.ner import load_ner_pipeline
+    return load_ner_pipeline(config.SPACY_MODEL)
+
+
+def _load_embedder():
+    from core.embedding import embedding_model_id, load_embedding_model
+    model = load_embedding_model()
+    if not config.EMBED_CACHE:
+        return model
+    from core.embed_cache import CachedEmbedder
+    from core.kvstore import KVStore
+    store = KVStore(os.path.join(config.CACHE_DIR, "embeddings.sqlite3"),
+                    max_bytes=config.EMBED_CACHE_MAX_MB * 1024 ** 2)
+    return CachedEmbedder(model, embedding_model_id(), store, dtype=config.EMBED_CACHE_DTYPE)
+
+
+def _load_llm():
+    # "groq" itself is registered by the entry point that knows the API key
+    from core.llm import LLMGateway
+    store = None
+    if config.LLM_CACHE:
+        from core.kvstore import KVStore
+        store = KVStore(os.path.join(config.CACHE_DIR, "llm_responses.sqlite3"),
+                        max_entries=config.LLM_CACHE_MAX_ENTRIES, ttl=config.LLM_CACHE_TTL)
+    return LLMGateway(lambda: registry.get("groq"), store)
+
+
+def _load_doc_type_classifier():
+    from core.classify import TieredClassifier, classify_with_llm, load_local_classifier
+    return TieredClassifier(load_local_classifier(), lambda text: classify_with_llm(text, registry.get("llm")))
+
+
+def _load_reranker():
+    if not config.RERANK:
+        return None
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(config.RERANK_MODEL)
+
+
+def _load_entity_cache():
+    from core.kvstore import KVStore
+    return KVStore(os.path.join(config.CACHE_DIR, "entities.sqlite3"),
+                   max_entries=config.ENTITY_CACHE_MAX_ENTRIES)
+
+
+def _load_summary_cache():
+    from core.kvstore import KVStore
+    return KVStore(os.path.join(config.CACHE_DIR, "summaries.sqlite3"),
+                   max_entries=config.SUMMARY_CACHE_MAX_ENTRIES)
+
+
+def _load_answer_cache():
+    if not config.ANSWER_CACHE:
+        return None
+    from core.answer_cache import SemanticAnswerCache
+    from core.kvstore import KVStore
+    return SemanticAnswerCache(KVStore(os.path.join(config.CACHE_DIR, "answers.sqlite3"),
+                                       max_entries=config.ANSWER_CACHE_MAX_DOCUMENTS))
+
+
+def _load_document_texts():
+    # Uploaded documents' text and type, so API requests can refer to them by doc_id
+    from core.kvstore import KVStore
+    return KVStore(os.path.join(config.CACHE_DIR, "documents.sqlite3"), max_entries=config.MAX_DOCUMENTS)
+
+
+def _load_pdf_pool():
+    if config.PDF_WORKERS <= 1:
+        return None
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    # spawn, not fork: the Streamlit server process is multi-threaded
+    return ProcessPoolExecutor(max_workers=config.PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _load_chroma():
+    from core.vectordb import open_vector_store
+    return open_vector_store()
+
+
+registry = ModelRegistry()
+registry.register("nlp", _load_nlp)
+registry.register("embedder", _load_embedder)
+registry.register("llm", _load_llm)
+registry.register("doc_type_classifier", _load_doc_type_classifier)
+registry.register("reranker", _load_reranker)
+registry.register("entity_cache", _load_entity_cache)
+registry.register("summary_cache", _load_summary_cache)
+registry.register("answer_cache", _load_answer_cache)
+registry.register("document_texts", _load_document_texts)
+registry.register("chroma", _load_chroma)
+registry.register("pdf_pool", _load_pdf_pool)
+
+
+if __name__ == "__main__":
+    # Pre-load everything once, e.g. in a container build step, to fill the model caches
+    registry.warmup(background=False)
+    for name, s in registry.stats().items():
+        print(f"{name}: {s}")
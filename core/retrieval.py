@@ -0,0 +1,144 @@
+"""Hybrid retrieval: BM25 over an in-process inverted index fused with Chroma's dense search.
+
+Dense and sparse rankings are combined with reciprocal rank fusion, optionally
+re-scored by a small cross-encoder, and chunks that overlap an already selected
+chunk (per their start/end offsets) are dropped.
+"""
+import math
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+
+from core import config
+from core.store import collection_version
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-./][a-z0-9]+)*")
+RRF_K = 60
+
+
+def tokenize(text):
+    # Keeps identifiers like "inv-2024-0001" or "7.2" as single terms
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Index:
+    def __init__(self, ids, documents, metadatas=None, k1=1.5, b=0.75):
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas) if metadatas is not None else [None] * len(self.ids)
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)
+        self.lengths = []
+        for i, doc in enumerate(self.documents):
+            terms = Counter(tokenize(doc))
+            self.lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self.postings[term].append((i, tf))
+        n = len(self.documents)
+        self.avg_length = sum(self.lengths) / n if n else 0.0
+        self.idf = {t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in self.postings.items()}
+
+    def search(self, query, k=10):
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / (self.avg_length or 1))
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda x: -x[1])[:k]
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_bm25_index(collection):
+    """Per-process BM25 index for ``collection``, rebuilt when the collection changes."""
+    key = (collection.name, *collection_version(collection))
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+    got = collection.get(include=["documents", "metadatas"])
+    index = BM25Index(got["ids"], got["documents"], got["metadatas"])
+    with _indexes_lock:
+        for stale in [k for k in _indexes if k[0] == collection.name]:
+            del _indexes[stale]
+        _indexes[key] = index
+        while len(_indexes) > config.BM25_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def build_answer_prompt(question, hits):
+    context = "\n".join(h["text"] for h in hits)
+    return f"""Answer the question using ONLY the information from this document context.
+If the answer is not in the context, say "I cannot find this information in the document."
+
+Context:
+{context}
+
+Question: {question}
+Answer:"""
+
+
+def _overlaps(meta, selected):
+    start, end = (meta or {}).get("start"), (meta or {}).get("end")
+    if start is None or end is None:
+        return False
+    for other in selected:
+        o_start, o_end = (other or {}).get("start"), (other or {}).get("end")
+        if o_start is None or o_end is None:
+            continue
+        shared = min(end, o_end) - max(start, o_start)
+        if shared > 0.5 * min(end - start, o_end - o_start):
+            return True
+    return False
+
+
+def hybrid_search(collection, embedder, question, k=3, candidates=None, reranker=None, mode="hybrid"):
+    """Return the top ``k`` chunks as ``{"id", "text", "metadata", "score"}`` dicts.
+
+    ``mode`` is ``"hybrid"``, ``"dense"`` or ``"bm25"`` (the latter two are for benchmarking).
+    """
+    candidates = candidates or config.RETRIEVAL_CANDIDATES
+    total = collection.count()
+    if total == 0:
+        return []
+    candidates = min(candidates, total)
+    pool, fused = {}, defaultdict(float)
+
+    if mode in ("hybrid", "dense"):
+        q_emb = embedder.encode([question])[0].tolist()
+        dense = collection.query(query_embeddings=[q_emb], n_results=candidates,
+                                 include=["documents", "metadatas"])
+        for rank, (id_, doc, meta) in enumerate(zip(dense["ids"][0], dense["documents"][0], dense["metadatas"][0])):
+            pool[id_] = (doc, meta)
+            fused[id_] += 1 / (RRF_K + rank + 1)
+
+    if mode in ("hybrid", "bm25"):
+        index = get_bm25_index(collection)
+        for rank, (i, _) in enumerate(index.search(question, candidates)):
+            id_ = index.ids[i]
+            pool[id_] = (index.documents[i], index.metadatas[i])
+            fused[id_] += 1 / (RRF_K + rank + 1)
+
+    ranked = sorted(fused.items(), key=lambda x: -x[1])
+    if reranker is not None and ranked:
+        ids = [id_ for id_, _ in ranked]
+        scores = reranker.predict([(question, pool[id_][0]) for id_ in ids])
+        ranked = sorted(zip(ids, (float(s) for s in scores)), key=lambda x: -x[1])
+
+    hits, selected = [], []
+    for id_, score in ranked:
+        doc, meta = pool[id_]
+        if _overlaps(meta, selected):
+            continue
+        hits.append({"id": id_, "text": doc, "metadata": meta, "score": round(score, 4)})
+        selected.append(meta)
+        if len(hits) == k:
+            break
+    return hits
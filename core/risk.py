@@ -0,0 +1,157 @@
+"""Map-reduce risk detection over the whole document.
+
+The text is split into clause-aligned segments, each segment is scanned with
+the same RISK_START/RISK_END prompt in parallel, and the blocks are merged and
+deduplicated. Segment boundaries are content-defined (a clause closes a
+segment when its hash says so, or when the segment is full), so editing one
+clause leaves the other segments' prompts unchanged and the LLM response cache
+answers them without a new call.
+"""
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from core import config
+from core.chunking import iter_chunks
+
+# Numbered clauses ("1.", "2.3", "(a)"), "Section/Article/Clause N" and ALL-CAPS headings
+_CLAUSE_START = re.compile(
+    r"^[ \t]*(?:\d+(?:\.\d+)*[.)]?\s|\([a-z0-9]{1,3}\)\s|(?i:section|article|clause|schedule)\s+\w+|[A-Z][A-Z &,'-]{3,}$)",
+    re.MULTILINE,
+)
+_LEVELS = {"High": 3, "Medium": 2, "Low": 1}
+
+
+def build_risk_prompt(text, doc_type):
+    return f"""You are a legal risk analyst. Analyze this document and identify risky clauses.
+
+For each risk, return EXACTLY:
+RISK_START
+Level: High/Medium/Low
+Clause: [risky text]
+Reason: [why risky]
+Suggestion: [what to do]
+RISK_END
+
+Document Type: {doc_type}
+Document: {text}"""
+
+
+def parse_risks(risk_text):
+    risks = []
+    for block in re.findall(r'RISK_START(.*?)RISK_END', risk_text, re.DOTALL):
+        risk = {}
+        for field, key in [('Level', 'Level'), ('Clause', 'Clause'), ('Reason', 'Reason'), ('Suggestion', 'Suggestion')]:
+            m = re.search(rf'{field}:\s*(.*?)(?:\n|$)', block)
+            if m:
+                risk[key] = m.group(1).strip()
+        if risk:
+            risks.append(risk)
+    return risks
+
+
+def get_risk_score(risks):
+    if not risks:
+        return 0, "Safe ✅", "low"
+    score = min(sum({"High": 30, "Medium": 15, "Low": 5}.get(r.get("Level", "Low"), 5) for r in risks), 100)
+    if score >= 60:
+        return score, "High Risk", "high"
+    elif score >= 30:
+        return score, "Medium Risk", "medium"
+    return score, "Low Risk", "low"
+
+
+def split_clauses(text):
+    starts = sorted({0, *(m.start() for m in _CLAUSE_START.finditer(text))})
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        clause = text[start:end].strip()
+        if clause:
+            yield clause
+
+
+def segment_document(text, max_chars=None, min_chars=None):
+    """Group clauses into segments of at most ``max_chars`` characters."""
+    max_chars = max_chars or config.RISK_SEGMENT_CHARS
+    min_chars = min_chars or max_chars // 3
+    if len(text) <= max_chars:
+        return [text]
+    segments, current, size = [], [], 0
+
+    def flush():
+        nonlocal current, size
+        if current:
+            segments.append("\n".join(current))
+        current, size = [], 0
+
+    for clause in split_clauses(text):
+        if len(clause) > max_chars:
+            # One oversized clause: flush, then cut it on sentence boundaries
+            flush()
+            segments.extend(c["text"] for c in iter_chunks(clause, max_tokens=max_chars // 5, overlap=0))
+            continue
+        if size + len(clause) > max_chars:
+            flush()
+        current.append(clause)
+        size += len(clause) + 1
+        # Content-defined boundary keeps later segments stable when one clause is edited
+        if size >= min_chars and int(hashlib.md5(clause.encode("utf-8")).hexdigest(), 16) % 3 == 0:
+            flush()
+    flush()
+    return segments
+
+
+def _risk_key(risk):
+    """Normalised clause text, falling back to the reason for findings that quote no clause."""
+    for field in ("Clause", "Reason"):
+        key = " ".join(re.sub(r"[^a-z0-9 ]", " ", risk.get(field, "").lower()).split())
+        if key:
+            return field, key
+    return None
+
+
+def merge_risks(risks):
+    """Keep the highest-level finding per clause; findings with neither clause nor reason are kept as they are."""
+    merged, loose = {}, []
+    for risk in risks:
+        key = _risk_key(risk)
+        if key is None:
+            loose.append(risk)
+            continue
+        best = merged.get(key)
+        if best is None or _LEVELS.get(risk.get("Level"), 0) > _LEVELS.get(best.get("Level"), 0):
+            merged[key] = risk
+    return list(merged.values()) + loose
+
+
+def format_risks(risks):
+    return "\n".join(
+        "RISK_START\n" + "".join(f"{field}: {risk[field]}\n" for field in ("Level", "Clause", "Reason", "Suggestion")
+                                 if field in risk) + "RISK_END"
+        for risk in risks
+    )
+
+
+def detect_risks_full(text, doc_type, llm, max_workers=None):
+    """Scan every segment; returns ``(risk_text, failed)``.
+
+    ``risk_text`` is the merged RISK_START/RISK_END text for :func:`parse_risks`
+    and ``failed`` the number of segments whose scan raised, so a partial scan
+    is not mistaken for a clean one. Raises only when every segment fails.
+    """
+    segments = segment_document(text)
+
+    def scan(segment):
+        return llm.complete(build_risk_prompt(segment, doc_type), temperature=0.2, max_tokens=1000)
+
+    workers = max(1, min(max_workers or config.RISK_MAX_WORKERS, len(segments)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(scan, s) for s in segments]
+    outputs, errors = [], []
+    for future in futures:
+        try:
+            outputs.append(future.result())
+        except Exception as e:
+            errors.append(e)
+    if errors and not outputs:
+        raise errors[0]
+    return format_risks(merge_risks(r for out in outputs for r in parse_risks(out))), len(errors)
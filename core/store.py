@@ -0,0 +1,178 @@
+"""Content-addressed, per-document vector collections.
+
+Each document gets its own Chroma collection named after a hash of its text,
+so sessions never see each other's chunks, re-uploading an identical file is
+a no-op and dropping a document is a single ``delete_collection`` call.
+
+Chunk ids are hashes of the chunk text. A new revision of a file (same
+filename, different content) is indexed by copying the embeddings of every
+chunk the previous revision already has and encoding only the rest; once it
+is complete the superseded revision is deleted. :func:`sync_chunks` updates
+a collection in place the same way, deleting chunks that are gone.
+"""
+import hashlib
+import threading
+import time
+
+from core import config
+from core.chunking import iter_page_chunks
+from core.ingest import ingest_records
+
+COLLECTION_PREFIX = "doc_"
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def doc_id_for(content):
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def collection_name(doc_id):
+    return f"{COLLECTION_PREFIX}{doc_id}"
+
+
+def doc_lock(doc_id):
+    """Per-document lock serialising writes to everything stored for ``doc_id``."""
+    with _locks_guard:
+        return _locks.setdefault(doc_id, threading.Lock())
+
+
+def get_document_collection(client, doc_id):
+    return client.get_collection(name=collection_name(doc_id))
+
+
+def collection_version(collection):
+    """Changes whenever the collection's contents may have changed."""
+    return collection.count(), (collection.metadata or {}).get("indexed_at")
+
+
+def is_indexed(client, doc_id):
+    try:
+        collection = get_document_collection(client, doc_id)
+    except ValueError:
+        return False
+    return bool((collection.metadata or {}).get("chunks"))
+
+
+def chunk_records(chunks):
+    """``(id, text, metadata)`` records for chunk dicts, ids being hashes of the chunk text.
+
+    Repeated text (boilerplate clauses, page footers) gets ``-1``, ``-2``... suffixes.
+    """
+    seen = {}
+    for c in chunks:
+        digest = hashlib.sha256(c["text"].encode("utf-8")).hexdigest()[:16]
+        n = seen[digest] = seen.get(digest, -1) + 1
+        yield (f"{digest}-{n}" if n else digest), c["text"], {k: v for k, v in c.items() if k != "text"}
+
+
+def stored_embeddings(*collections):
+    """``known`` callback for :func:`core.ingest.ingest_records` that reads embeddings from ``collections``."""
+    def known(ids):
+        found = {}
+        for collection in collections:
+            wanted = [i for i in ids if i not in found]
+            if not wanted:
+                break
+            got = collection.get(ids=wanted, include=["embeddings"])
+            found.update((i, [float(x) for x in e]) for i, e in zip(got["ids"], got["embeddings"]))
+        return found
+    return known
+
+
+def sync_chunks(collection, chunks, embedder, batch_size=None, seed=None):
+    """Make ``collection`` hold exactly ``chunks``, encoding only text it (or ``seed``) lacks.
+
+    Returns ingest stats with ``reused`` / ``embedded`` / ``deleted`` counts.
+    """
+    existing = set(collection.get(include=[])["ids"])
+    seen = set()
+
+    def records():
+        for record in chunk_records(chunks):
+            seen.add(record[0])
+            yield record
+
+    sources = (collection,) if seed is None else (collection, seed)
+    stats = ingest_records(collection, records(), embedder, batch_size, known=stored_embeddings(*sources))
+    gone = sorted(existing - seen)
+    if gone:
+        collection.delete(ids=gone)
+    stats["deleted"] = len(gone)
+    return stats
+
+
+def previous_revision(client, filename, doc_id):
+    """The newest other fully indexed document stored under ``filename``, or ``None``."""
+    revisions = [c for c in client.list_collections()
+                 if c.name.startswith(COLLECTION_PREFIX) and c.name != collection_name(doc_id)
+                 and (c.metadata or {}).get("filename") == filename and (c.metadata or {}).get("chunks")]
+    return max(revisions, key=lambda c: c.metadata.get("created_at", 0), default=None)
+
+
+def index_document(client, doc_id, chunks, embedder, batch_size=None, filename=None):
+    """Index ``chunks`` under ``doc_id`` unless that exact document is already stored.
+
+    ``chunks`` is an iterable (possibly a generator) of chunk dicts from
+    :mod:`core.chunking`; every key except ``text`` is stored as metadata.
+    With ``filename``, chunks unchanged since the file's previous revision
+    reuse its embeddings, and that revision is deleted afterwards (``deleted``
+    counts its chunks the new one no longer has). Returns ``(collection, stats)``; ``stats`` is
+    ``None`` when the document was already indexed and nothing had to be
+    embedded.
+    """
+    with doc_lock(doc_id):
+        if is_indexed(client, doc_id):
+            return get_document_collection(client, doc_id), None
+        metadata = {"created_at": time.time()}
+        if filename:
+            metadata["filename"] = filename
+        collection = client.get_or_create_collection(name=collection_name(doc_id), metadata=metadata)
+        seed = previous_revision(client, filename, doc_id) if filename else None
+        # A collection left half-written by an interrupted run seeds itself
+        stats = sync_chunks(collection, chunks, embedder, batch_size, seed)
+        if seed is not None:
+            stats["revision_of"] = seed.name[len(COLLECTION_PREFIX):]
+            kept = set(collection.get(include=[])["ids"])
+            stats["deleted"] += len(set(seed.get(include=[])["ids"]) - kept)
+        # Only mark the collection complete once every chunk is written
+        collection.modify(metadata={**metadata, "chunks": stats["chunks"], "indexed_at": time.time()})
+    if seed is not None:
+        delete_document(client, stats["revision_of"])
+    prune_documents(client)
+    return collection, stats
+
+
+def index_pages(client, doc_id, pages, embedder, batch_size=None, filename=None):
+    """:func:`index_document` over extracted pages; always consumes ``pages`` to the end.
+
+    The caller may be tapping the page stream for the document text, so it is
+    drained even when the document is already indexed. Returns the ingest stats.
+    """
+    _, stats = index_document(client, doc_id, iter_page_chunks(pages), embedder, batch_size, filename)
+    if stats is None:
+        for _ in pages:
+            pass
+    return stats
+
+
+def delete_document(client, doc_id):
+    with doc_lock(doc_id):
+        try:
+            client.delete_collection(name=collection_name(doc_id))
+        except ValueError:
+            pass
+
+
+def prune_documents(client, keep=None):
+    keep = keep if keep is not None else config.MAX_DOCUMENTS
+    docs = [c for c in client.list_collections() if c.name.startswith(COLLECTION_PREFIX)]
+    if len(docs) <= keep:
+        return 0
+    docs.sort(key=lambda c: (c.metadata or {}).get("created_at", 0))
+    for c in docs[:len(docs) - keep]:
+        delete_document(client, c.name[len(COLLECTION_PREFIX):])
+    return len(docs) - keep
@@ -0,0 +1,148 @@
+"""Hierarchical (map-reduce) document analysis.
+
+The chunks already stored in the vector collection are grouped into sections,
+each section is summarised in parallel, and the section summaries are reduced
+(again in groups if they are still too long) into the final analysis.
+Section summaries are kept per document in a KVStore, so a repeat analysis
+only pays for the final combine step; the final analysis can be streamed.
+
+Q&A does not read these summaries: retrieval already hands the model the
+exact chunk text, and a paraphrase next to it adds tokens without adding
+facts the chunks lack.
+"""
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core import config
+
+SECTION_PROMPT = """Summarize this section of a {doc_type} in 3-5 bullet points.
+Keep names, organizations, dates, amounts and obligations exactly as written.
+
+Section:
+{text}"""
+
+COMBINE_PROMPT = """Analyze this document comprehensively from the summaries of its sections (in document order).
+Document Type: {doc_type}
+
+Provide:
+1. **Key Information:** Names, Organizations, Dates, Money, Locations
+2. **Summary:** 4-5 clear lines
+3. **Key Insights:** 3-4 important observations
+4. **Recommendations:** 2-3 action items
+
+Section summaries:
+{text}"""
+
+# Part of the section cache key, so editing the prompt retires old summaries
+SECTION_PROMPT_VERSION = hashlib.sha256(SECTION_PROMPT.encode("utf-8")).hexdigest()[:8]
+
+
+def build_analysis_prompt(text, doc_type):
+    return f"""Analyze this document comprehensively.
+Document Type: {doc_type}
+
+Provide:
+1. **Key Information:** Names, Organizations, Dates, Money, Locations
+2. **Summary:** 4-5 clear lines
+3. **Key Insights:** 3-4 important observations
+4. **Recommendations:** 2-3 action items
+
+Document: {text[:3000]}"""
+
+
+def complete(llm, prompt, on_delta=None, **kwargs):
+    """``llm.complete(prompt)``, streamed through ``on_delta(text_delta)`` when given."""
+    if on_delta is None:
+        return llm.complete(prompt, **kwargs)
+    parts = []
+    for delta in llm.stream(prompt, **kwargs):
+        parts.append(delta)
+        on_delta(delta)
+    return "".join(parts)
+
+
+def group_texts(texts, max_chars):
+    groups, current, size = [], [], 0
+    for text in texts:
+        if current and size + len(text) > max_chars:
+            groups.append("\n".join(current))
+            current, size = [], 0
+        current.append(text)
+        size += len(text) + 1
+    if current:
+        groups.append("\n".join(current))
+    return groups
+
+
+def ordered_chunks(collection):
+    """Chunk texts of a per-document collection in document order, without the overlap between neighbours.
+
+    Each chunk is cut to the part of its ``start``/``end`` span that earlier
+    chunks have not covered, so carried-over sentences are summarised once.
+    """
+    got = collection.get(include=["documents", "metadatas"])
+    rows = sorted(zip(got["metadatas"], got["documents"]), key=lambda r: (r[0] or {}).get("index", 0))
+    texts, covered = [], 0
+    for meta, doc in rows:
+        start, end = (meta or {}).get("start"), (meta or {}).get("end")
+        if start is not None and end is not None and end - start == len(doc):
+            if end <= covered:
+                continue
+            doc = doc[max(0, covered - start):].strip()
+            covered = end
+        if doc:
+            texts.append(doc)
+    return texts
+
+
+def summarize_sections(sections, doc_type, llm, store=None, doc_id=None, level=0, on_section=None,
+                       max_workers=None):
+    keys = [f"{doc_id}:{level}:{doc_type}:{SECTION_PROMPT_VERSION}:{hashlib.sha256(s.encode('utf-8')).hexdigest()[:16]}"
+            for s in sections]
+    cached = store.get_many(keys) if store is not None and doc_id else {}
+    summaries = [cached[k].decode("utf-8") if k in cached else None for k in keys]
+    done = sum(s is not None for s in summaries)
+    if on_section:
+        for i, s in enumerate(summaries):
+            if s is not None:
+                on_section(level, i, s, done, len(sections))
+
+    def summarize(section):
+        return llm.complete(SECTION_PROMPT.format(doc_type=doc_type, text=section), temperature=0.2, max_tokens=250)
+
+    missing = [i for i, s in enumerate(summaries) if s is None]
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers or config.SUMMARY_MAX_WORKERS, len(missing)))) as pool:
+            futures = {pool.submit(summarize, sections[i]): i for i in missing}
+            # Callbacks run here, in the caller's thread, as each section finishes
+            for future in as_completed(futures):
+                i = futures[future]
+                summaries[i] = future.result()
+                if store is not None and doc_id:
+                    store.put(keys[i], summaries[i].encode("utf-8"))
+                done += 1
+                if on_section:
+                    on_section(level, i, summaries[i], done, len(sections))
+    return summaries
+
+
+def analyse_chunks(chunks, doc_type, llm, store=None, doc_id=None, on_section=None, on_delta=None):
+    """Summarise ``chunks`` section by section, reduce, and return the final analysis.
+
+    ``on_delta`` receives the final analysis as it streams in.
+    """
+    max_chars = config.SUMMARY_GROUP_CHARS
+    texts, level = chunks, 0
+    while True:
+        sections = group_texts(texts, max_chars)
+        if level and len(sections) >= len(texts):
+            # Summaries too long to pair up: another pass would not shrink them, so combine what there is
+            break
+        summaries = summarize_sections(sections, doc_type, llm, store, doc_id, level, on_section)
+        texts, level = summaries, level + 1
+        # Keep reducing until the summaries fit in one combine prompt
+        if len(sections) == 1 or sum(len(s) + 1 for s in summaries) <= max_chars:
+            break
+    joined = "\n\n".join(texts)
+    return complete(llm, COMBINE_PROMPT.format(doc_type=doc_type, text=joined), on_delta,
+                    temperature=0.3, max_tokens=700)
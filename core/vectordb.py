@@ -0,0 +1,35 @@
+"""The vector store shared by the app, the API and the rag scripts.
+
+``open_vector_store()`` returns a Chroma client persisted under
+``VECTORDB_DIR``, so embeddings survive restarts and every entry point reads
+and writes the same collections. Opening the store only connects to its
+SQLite catalogue; a collection's HNSW index is loaded from disk the first time
+that collection is queried, so startup cost does not grow with the number of
+stored documents. With ``VECTORDB_CACHE_MB`` set, indexes beyond that budget
+are evicted least-recently-used.
+
+``VECTORDB_BACKEND=numpy`` swaps Chroma for the in-process float16 store in
+:mod:`core.annstore`, which implements the same subset of the client API.
+"""
+from core import config
+
+BACKENDS = ("chroma", "numpy", "memory")
+
+
+def open_vector_store(path=None, backend=None):
+    backend = backend or config.VECTORDB_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown vector store backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+    if backend == "numpy":
+        from core.annstore import NumpyVectorStore
+        return NumpyVectorStore(path or config.VECTORDB_DIR)
+    import chromadb
+    from chromadb.config import Settings
+    options = {"anonymized_telemetry": False}
+    if config.VECTORDB_CACHE_MB:
+        options.update(chroma_segment_cache_policy="LRU",
+                       chroma_memory_limit_bytes=config.VECTORDB_CACHE_MB * 1024 ** 2)
+    if backend == "memory":
+        # Nothing is written to disk; for tests and throwaway benchmarks
+        return chromadb.EphemeralClient(settings=Settings(**options))
+    return chromadb.PersistentClient(path=path or config.VECTORDB_DIR, settings=Settings(**options))
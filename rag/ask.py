@@ -1,12 +1,32 @@
-from sentence_transformers import SentenceTransformer
-from chromadb import PersistentClient
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+
+from core import config
+from core.corpus import get_corpus, search_corpus
+from core.registry import registry
+from core.vectordb import open_vector_store
+
+parser = argparse.ArgumentParser(description="Ask questions against the sample index or the document corpus")
+parser.add_argument("--corpus", action="store_true", help="search the corpus built by rag/ingest_corpus.py")
+parser.add_argument("--db", default=config.VECTORDB_DIR, help="vector store directory")
+parser.add_argument("--filename", action="append", help="only search these files (repeatable)")
+parser.add_argument("--doc-type", action="append", help="only search these document types (repeatable)")
+parser.add_argument("--k", type=int, default=1)
+args = parser.parse_args()
 
 # Load embedding model
-model = SentenceTransformer("all-MiniLM-L6-v2")
+model = registry.get("embedder")
 
 # Load vector DB
-client = PersistentClient(path="rag/chroma_db")
-collection = client.get_collection(name="doc")
+client = open_vector_store(args.db)
+if args.corpus:
+    collection = get_corpus(client)
+else:
+    collection = client.get_collection(name="doc")
 
 print("\nAI Document Question Answering (Evidence-Based)")
 print("Type 'exit' to quit.\n")
@@ -16,16 +36,27 @@ while True:
     if q.lower() == "exit":
         break
 
+    if args.corpus:
+        hits = search_corpus(collection, model, q, k=args.k, filenames=args.filename, doc_types=args.doc_type)
+        print("\nAI Answer (from corpus):")
+        if not hits:
+            print("No matching documents.")
+        for hit in hits:
+            meta = hit["metadata"]
+            print(f"[{meta['filename']}, page {meta.get('page', '?')}] {hit['text']}\n")
+        continue
+
     # Embed question
     q_emb = model.encode(q).tolist()
 
-    # Retrieve most relevant chunk
+    # Retrieve the k most relevant chunks
     results = collection.query(
         query_embeddings=[q_emb],
-        n_results=1
+        n_results=args.k
     )
 
-    top_chunk = results["documents"][0][0]
-
     print("\nAI Answer (from document):")
-    print(top_chunk)
+    if not results["documents"][0]:
+        print("The document has no indexed chunks.")
+    for chunk in results["documents"][0]:
+        print(f"{chunk}\n")
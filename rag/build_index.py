@@ -1,24 +1,37 @@
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb import PersistentClient
+import os
+import sys
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+from core import config
+from core.chunking import iter_chunks
+from core.registry import registry
+from core.store import sync_chunks
+from core.vectordb import open_vector_store
+
+parser = argparse.ArgumentParser(description="Build the RAG vector index")
+parser.add_argument("--batch-size", type=int, default=config.INGEST_BATCH_SIZE)
+parser.add_argument("--db", default=config.VECTORDB_DIR, help="vector store directory")
+args = parser.parse_args()
+
+model = registry.get("embedder")
 
 with open("rag/sample_doc.txt") as f:
     text = f.read()
 
-chunks = [c.strip() for c in text.split(".") if c.strip()]
-
-client = PersistentClient(path="rag/chroma_db")
+client = open_vector_store(args.db)
 
 collection = client.get_or_create_collection(name="doc")
 
-for i, chunk in enumerate(chunks):
-    emb = model.encode(chunk).tolist()
-    collection.add(
-        documents=[chunk],
-        embeddings=[emb],
-        ids=[str(i)]
-    )
+# Only chunks whose text changed since the last build are embedded; vanished ones are deleted
+stats = sync_chunks(collection, iter_chunks(text), model, batch_size=args.batch_size)
+collection.modify(metadata={"indexed_at": time.time()})
 
-print("Vector index built and saved.")
+print(f"Vector index built and saved: {stats['chunks']} chunks in {stats['seconds']}s "
+      f"({stats['chunks_per_sec']} chunks/sec).")
+print(f"Chunks reused: {stats['reused']}, recomputed: {stats['embedded']}, deleted: {stats['deleted']}.")
+if hasattr(model, "stats"):
+    print("Embedding cache:", model.stats())
@@ -0,0 +1,80 @@
+"""Index many documents into the shared corpus collection.
+
+    python rag/ingest_corpus.py contracts/ invoices/2024-06.pdf [--doc-type Contract]
+
+Directories are walked for PDF, DOCX and TXT files. The document type comes
+from --doc-type or the local classifier (Unknown when it is missing or unsure);
+documents already in the corpus are skipped.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+from core import config
+from core.chunking import iter_page_chunks
+from core.classify import load_local_classifier, TieredClassifier
+from core.corpus import add_to_corpus, get_corpus
+from core.extract import iter_pages
+from core.registry import registry
+from core.vectordb import open_vector_store
+from core.store import doc_id_for
+
+EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+def iter_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.lower().endswith(EXTENSIONS):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--db", default=config.VECTORDB_DIR)
+    parser.add_argument("--doc-type", help="type for every file instead of the local classifier")
+    parser.add_argument("--batch-size", type=int, default=config.INGEST_BATCH_SIZE)
+    args = parser.parse_args()
+
+    collection = get_corpus(open_vector_store(args.db))
+    embedder = registry.get("embedder")
+    classifier = TieredClassifier(load_local_classifier(), lambda text: "Unknown")
+    added = skipped = failed = chunks = 0
+    start = time.perf_counter()
+    for path in iter_files(args.paths):
+        with open(path, "rb") as f:
+            data = f.read()
+        filename = os.path.basename(path)
+        try:
+            pages = list(iter_pages(filename.lower(), data, registry.get("pdf_pool")))
+            doc_type = args.doc_type or classifier.classify("\n".join(p["text"] for p in pages if p["text"]))
+            stats = add_to_corpus(collection, doc_id_for(data), filename, doc_type, iter_page_chunks(pages),
+                                  embedder, batch_size=args.batch_size)
+        except Exception as e:
+            failed += 1
+            print(f"FAILED  {path}: {e}")
+            continue
+        if stats is None:
+            skipped += 1
+            print(f"skipped {path} (already indexed)")
+        else:
+            added += 1
+            chunks += stats["chunks"]
+            print(f"added   {path} [{doc_type}] {stats['chunks']} chunks in {stats['seconds']}s")
+
+    seconds = time.perf_counter() - start
+    print(f"\n{added} added, {skipped} skipped, {failed} failed; {chunks} chunks in {seconds:.1f}s "
+          f"({chunks / seconds if seconds else 0:.1f} chunks/sec). Corpus size: {collection.count()} chunks.")
+
+
+if __name__ == "__main__":
+    main()
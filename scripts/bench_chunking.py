@@ -0,0 +1,74 @@
+"""Compare the old fixed 500-character splitter with core.chunking.
+
+    python scripts/bench_chunking.py --k 3
+
+For each splitter it reports chunk count, chunking and embedding time, and the
+fraction of labelled questions whose answer appears in the top-k retrieved chunks.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+import numpy as np
+
+from core.chunking import iter_chunks
+from core.registry import registry
+from qa import contains_answer, load_docs, load_qa, DEFAULT_QA
+
+
+def fixed_500(text):
+    return [text[i:i + 500] for i in range(0, len(text), 500)]
+
+
+def structured(text):
+    return [c["text"] for c in iter_chunks(text)]
+
+
+SPLITTERS = {"fixed-500": fixed_500, "structured": structured}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--qa", default=DEFAULT_QA)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    qa = load_qa(args.qa)
+    docs = load_docs(qa)
+    embedder = registry.get("embedder")
+    model = getattr(embedder, "model", embedder)  # bypass the embedding cache for honest timings
+
+    questions = [item["question"] for item in qa]
+    q_emb = model.encode(questions, normalize_embeddings=True)
+
+    print(f"{'splitter':<12} {'chunks':>7} {'avg chars':>10} {'chunk ms':>9} {'embed s':>8} {'hit@1':>6} {'hit@' + str(args.k):>6}")
+    for name, split in SPLITTERS.items():
+        chunks, chunk_seconds, embed_seconds = {}, 0.0, 0.0
+        embeddings = {}
+        for doc, text in docs.items():
+            t = time.perf_counter()
+            chunks[doc] = split(text)
+            chunk_seconds += time.perf_counter() - t
+            t = time.perf_counter()
+            embeddings[doc] = model.encode(chunks[doc], normalize_embeddings=True)
+            embed_seconds += time.perf_counter() - t
+
+        hits_1 = hits_k = 0
+        for item, q in zip(qa, q_emb):
+            order = np.argsort(-(embeddings[item["doc"]] @ q))
+            top = [chunks[item["doc"]][i] for i in order[:args.k]]
+            hits_1 += contains_answer(top[0], item["answer"])
+            hits_k += any(contains_answer(c, item["answer"]) for c in top)
+
+        n_chunks = sum(len(c) for c in chunks.values())
+        avg_chars = sum(len(x) for c in chunks.values() for x in c) / max(n_chunks, 1)
+        print(f"{name:<12} {n_chunks:>7} {avg_chars:>10.0f} {chunk_seconds * 1000:>9.1f} {embed_seconds:>8.2f} "
+              f"{hits_1 / len(qa):>6.2f} {hits_k / len(qa):>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
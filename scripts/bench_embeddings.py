@@ -0,0 +1,89 @@
+"""Encode throughput and retrieval quality of the embedding backends.
+
+    python scripts/bench_embeddings.py [--backends torch int8 onnx] [--batch-sizes 16 32 64 128] [--threads 1 2 4]
+
+Throughput is chunks/sec encoding the labelled documents' chunks (cycled up to
+--chunks) for every backend, thread count and batch size, with the embedding
+cache bypassed. Quality compares each backend with float32 PyTorch on the
+labelled Q&A set: cosine similarity of the chunk vectors and hit@1/hit@k of
+dense retrieval. A backend passes when its hit@k is at most --tolerance below
+the baseline's and its mean cosine similarity is at least --min-cosine; the
+script exits with status 1 if any backend fails.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from itertools import cycle, islice
+
+import numpy as np
+
+from core.chunking import iter_chunks
+from core.embedding import BACKENDS, load_embedding_model
+from qa import contains_answer, load_docs, load_qa, DEFAULT_QA
+
+
+def retrieval(model, qa, chunks, k):
+    embeddings = {doc: model.encode(texts, normalize_embeddings=True) for doc, texts in chunks.items()}
+    questions = model.encode([item["question"] for item in qa], normalize_embeddings=True)
+    hits_1 = hits_k = 0
+    for item, q in zip(qa, questions):
+        order = np.argsort(-(embeddings[item["doc"]] @ q))
+        top = [chunks[item["doc"]][i] for i in order[:k]]
+        hits_1 += contains_answer(top[0], item["answer"])
+        hits_k += any(contains_answer(c, item["answer"]) for c in top)
+    return embeddings, hits_1 / len(qa), hits_k / len(qa)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--qa", default=DEFAULT_QA)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunks", type=int, default=512, help="chunks encoded per throughput run")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.02, help="allowed hit@k drop versus torch")
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    args = parser.parse_args()
+
+    qa = load_qa(args.qa)
+    chunks = {doc: [c["text"] for c in iter_chunks(text)] for doc, text in load_docs(qa).items()}
+    texts = list(islice(cycle([t for doc_chunks in chunks.values() for t in doc_chunks]), args.chunks))
+
+    print(f"{'backend':<8} {'threads':>7} " + " ".join(f"{'bs=' + str(bs):>8}" for bs in args.batch_sizes)
+          + "   (chunks/sec)")
+    for backend in args.backends:
+        for threads in args.threads:
+            model = load_embedding_model(backend=backend, threads=threads)
+            model.encode(texts[:32])  # warm up kernels and ONNX Runtime's allocator
+            rates = []
+            for bs in args.batch_sizes:
+                t = time.perf_counter()
+                model.encode(texts, batch_size=bs)
+                rates.append(len(texts) / (time.perf_counter() - t))
+            print(f"{backend:<8} {threads:>7} " + " ".join(f"{r:>8.0f}" for r in rates))
+
+    baseline, base_1, base_k = retrieval(load_embedding_model(backend="torch", threads=0), qa, chunks, args.k)
+    print(f"\n{'backend':<8} {'cos mean':>9} {'cos min':>8} {'hit@1':>6} {'hit@' + str(args.k):>6}  verdict")
+    failed = []
+    for backend in args.backends:
+        if backend == "torch":
+            print(f"{'torch':<8} {1.0:>9.4f} {1.0:>8.4f} {base_1:>6.2f} {base_k:>6.2f}  baseline")
+            continue
+        embeddings, hit_1, hit_k = retrieval(load_embedding_model(backend=backend, threads=0), qa, chunks, args.k)
+        cosines = np.concatenate([(embeddings[doc] * baseline[doc]).sum(1) for doc in chunks])
+        ok = hit_k >= base_k - args.tolerance and cosines.mean() >= args.min_cosine
+        if not ok:
+            failed.append(backend)
+        print(f"{backend:<8} {cosines.mean():>9.4f} {cosines.min():>8.4f} {hit_1:>6.2f} {hit_k:>6.2f}  "
+              f"{'ok' if ok else 'OUTSIDE TOLERANCE'}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
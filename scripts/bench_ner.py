@@ -0,0 +1,70 @@
+"""Compare full-pipeline ``nlp(text)`` with the batched NER engine in core.ner.
+
+    python scripts/bench_ner.py [--docs data/contracts] [--repeat 5] [--n-process 2]
+
+Reports documents/sec and characters/sec for both, and how many of the
+full pipeline's (text, label) entities the batched engine also finds.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import glob
+import time
+
+import spacy
+
+from core import config
+from core.ner import extract_ner, load_ner_pipeline
+from qa import ROOT
+
+SAMPLE_DOCS = [os.path.join(ROOT, "scripts", "data", "sample_contract.txt"), os.path.join(ROOT, "rag", "sample_doc.txt")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", help="directory of .txt files (default: the bundled samples)")
+    parser.add_argument("--model", default=config.SPACY_MODEL)
+    parser.add_argument("--repeat", type=int, default=5, help="times each document is processed")
+    parser.add_argument("--batch-size", type=int, default=config.NER_BATCH_SIZE)
+    parser.add_argument("--n-process", type=int, default=config.NER_PROCESSES)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.docs, "*.txt"))) if args.docs else SAMPLE_DOCS
+    texts = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            texts.append(f.read())
+    texts = texts * args.repeat
+    chars = sum(len(t) for t in texts)
+
+    full = spacy.load(args.model)
+    t = time.perf_counter()
+    baseline = []
+    for text in texts:
+        full.max_length = max(full.max_length, len(text) + 1)
+        baseline.append({(e.text, e.label_) for e in full(text).ents})
+    full_seconds = time.perf_counter() - t
+
+    nlp = load_ner_pipeline(args.model)
+    t = time.perf_counter()
+    batched = [{(e.text, e.label) for e in ents}
+               for ents in extract_ner(texts, nlp, batch_size=args.batch_size, n_process=args.n_process)]
+    batched_seconds = time.perf_counter() - t
+
+    found = sum(len(a & b) for a, b in zip(baseline, batched))
+    total = sum(len(a) for a in baseline)
+    print(f"{len(texts)} documents, {chars:,} characters; model {args.model}")
+    print(f"full pipeline: {full.pipe_names}")
+    print(f"batched:       {nlp.pipe_names}\n")
+    print(f"{'engine':<10} {'seconds':>8} {'docs/s':>8} {'kchars/s':>9}")
+    for name, seconds in (("nlp(text)", full_seconds), ("batched", batched_seconds)):
+        print(f"{name:<10} {seconds:>8.2f} {len(texts) / seconds:>8.1f} {chars / seconds / 1000:>9.1f}")
+    print(f"\nSpeed-up: {full_seconds / batched_seconds:.1f}x; "
+          f"entity agreement: {found}/{total} ({found / total if total else 1:.0%})")
+
+
+if __name__ == "__main__":
+    main()
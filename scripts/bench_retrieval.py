@@ -0,0 +1,69 @@
+"""Compare dense, BM25 and hybrid retrieval on the labelled Q&A set.
+
+    python scripts/bench_retrieval.py --k 3 [--rerank]
+
+Each document is indexed into an in-memory Chroma collection exactly as the
+app does it; for every retrieval mode the script reports recall@1, recall@k
+(the answer appears in a top-k chunk) and per-query latency.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+from core import config
+from core.chunking import iter_chunks
+from core.metrics import percentile
+from core.registry import registry
+from core.retrieval import hybrid_search
+from core.store import doc_id_for, index_document
+from core.vectordb import open_vector_store
+from qa import contains_answer, load_docs, load_qa, DEFAULT_QA
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--qa", default=DEFAULT_QA)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--candidates", type=int, default=config.RETRIEVAL_CANDIDATES)
+    parser.add_argument("--rerank", action="store_true", help=f"also score hybrid + {config.RERANK_MODEL}")
+    args = parser.parse_args()
+
+    qa = load_qa(args.qa)
+    docs = load_docs(qa)
+    embedder = registry.get("embedder")
+    client = open_vector_store(backend="memory")
+    collections = {}
+    for doc, text in docs.items():
+        collections[doc], _ = index_document(client, doc_id_for(text), iter_chunks(text), embedder)
+
+    modes = [("dense", "dense", None), ("bm25", "bm25", None), ("hybrid", "hybrid", None)]
+    if args.rerank:
+        from sentence_transformers import CrossEncoder
+        modes.append(("hybrid+rerank", "hybrid", CrossEncoder(config.RERANK_MODEL)))
+
+    # Warm the BM25 indexes and the query path so the first mode is not penalised
+    for doc, collection in collections.items():
+        hybrid_search(collection, embedder, "warmup", k=args.k, candidates=args.candidates)
+
+    print(f"{'mode':<14} {'recall@1':>9} {'recall@' + str(args.k):>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, mode, reranker in modes:
+        hits_1 = hits_k = 0
+        latencies = []
+        for item in qa:
+            t = time.perf_counter()
+            hits = hybrid_search(collections[item["doc"]], embedder, item["question"], k=args.k,
+                                 candidates=args.candidates, reranker=reranker, mode=mode)
+            latencies.append((time.perf_counter() - t) * 1000)
+            texts = [h["text"] for h in hits]
+            hits_1 += bool(texts) and contains_answer(texts[0], item["answer"])
+            hits_k += any(contains_answer(t, item["answer"]) for t in texts)
+        print(f"{name:<14} {hits_1 / len(qa):>9.2f} {hits_k / len(qa):>9.2f} "
+              f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
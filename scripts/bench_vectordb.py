@@ -0,0 +1,162 @@
+"""Compare vector store backends on cold start, latency, recall and RAM at several sizes.
+
+    python scripts/bench_vectordb.py --sizes 10000 100000 1000000 [--backends chroma numpy] [--dir /tmp/vdb-bench]
+
+For each size a collection of synthetic unit vectors (the embedding model's
+dimension, scattered around random topic centres like real chunk embeddings)
+is written to its own store directory per backend, reused on later
+runs. Cold start is measured in a fresh Python process: open the store, fetch
+the collection and answer the first query. Warm p50/p95, recall@k against an
+exact search and the probe process's RSS growth come from the queries that
+follow. The 1M run needs several GB of RAM and a while
+to build the first time.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import subprocess
+import time
+
+import numpy as np
+
+from core import config
+from core.metrics import percentile
+
+COLLECTION = "bench"
+TOPICS = 1000
+SPREAD = 0.6
+
+
+def unit(v):
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def random_vectors(rng, n, dim):
+    centres = unit(np.random.default_rng(1).standard_normal((TOPICS, dim), dtype=np.float32))
+    noise = rng.standard_normal((n, dim), dtype=np.float32) * (SPREAD / np.sqrt(dim))
+    return unit(centres[rng.integers(TOPICS, size=n)] + noise)
+
+
+def batch_vectors(size, lo, hi, dim):
+    # Seeded per batch so a resumed build writes the same vectors
+    return random_vectors(np.random.default_rng([size, lo]), hi - lo, dim)
+
+
+def query_vectors(queries, dim):
+    return random_vectors(np.random.default_rng(0), queries + 1, dim)
+
+
+def build(path, size, dim, backend, batch):
+    from core.vectordb import open_vector_store
+    client = open_vector_store(path, backend)
+    collection = client.get_or_create_collection(COLLECTION)
+    have = collection.count()
+    if have >= size:
+        return 0.0
+    start = time.perf_counter()
+    for lo in range(have - have % batch, size, batch):
+        hi = min(lo + batch, size)
+        collection.upsert(ids=[str(i) for i in range(lo, hi)], embeddings=batch_vectors(size, lo, hi, dim).tolist(),
+                          metadatas=[{"doc_id": f"d{i // 100}"} for i in range(lo, hi)])
+        print(f"\r  wrote {hi:,}/{size:,}", end="", flush=True)
+    print()
+    if hasattr(collection, "build_index") and size > config.ANN_EXACT_MAX:
+        collection.build_index()
+    return time.perf_counter() - start
+
+
+def exact_neighbours(size, dim, batch, queries, k):
+    """Ids of the true top ``k`` for each query, by brute force over the regenerated vectors."""
+    best_d = np.zeros((len(queries), 0), np.float32)
+    best_i = np.zeros((len(queries), 0), np.int64)
+    for lo in range(0, size, batch):
+        hi = min(lo + batch, size)
+        d = np.concatenate([best_d, -queries @ batch_vectors(size, lo, hi, dim).T], 1)
+        i = np.concatenate([best_i, np.broadcast_to(np.arange(lo, hi), (len(queries), hi - lo))], 1)
+        keep = np.argpartition(d, k - 1, axis=1)[:, :k]
+        best_d, best_i = np.take_along_axis(d, keep, 1), np.take_along_axis(i, keep, 1)
+    return [{str(i) for i in row} for row in best_i]
+
+
+def rss_mb():
+    """Current resident set size (Linux)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+def probe(path, dim, backend, queries, k):
+    """Runs in a fresh process; prints timings, RSS growth and result ids as JSON."""
+    qs = query_vectors(queries, dim).tolist()
+    rss_before = rss_mb()
+    t0 = time.perf_counter()
+    from core.vectordb import open_vector_store
+    client = open_vector_store(path, backend)
+    collection = client.get_collection(COLLECTION)
+    opened = time.perf_counter() - t0
+    t = time.perf_counter()
+    collection.query(query_embeddings=[qs[0]], n_results=k)
+    first = time.perf_counter() - t
+    latencies, ids = [], []
+    for q in qs[1:]:
+        t = time.perf_counter()
+        ids.append(collection.query(query_embeddings=[q], n_results=k, include=[])["ids"][0])
+        latencies.append((time.perf_counter() - t) * 1000)
+    rss_growth = rss_mb() - rss_before
+    print(json.dumps({"open_s": opened, "first_query_s": first, "cold_start_s": opened + first,
+                      "p50_ms": percentile(latencies, 50), "p95_ms": percentile(latencies, 95),
+                      "rss_mb": rss_growth, "ids": ids}))
+
+
+def dir_size_mb(path):
+    total = 0
+    for root, _, names in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, n)) for n in names)
+    return total / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dir", default=os.path.join(config.CACHE_DIR, "bench_vectordb"))
+    parser.add_argument("--backends", nargs="+", default=["chroma", "numpy"])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--probe", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        return probe(args.probe, args.dim, args.backends[0], args.queries, args.k)
+    if "memory" in args.backends:
+        parser.error("cold start needs a persistent backend")
+
+    rows = []
+    for size in args.sizes:
+        truth = exact_neighbours(size, args.dim, args.batch, query_vectors(args.queries, args.dim)[1:], args.k)
+        for backend in args.backends:
+            path = os.path.join(args.dir, f"{backend}-{size}")
+            print(f"{backend}: {size:,} vectors -> {path}")
+            build_seconds = build(path, size, args.dim, backend, args.batch)
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--probe", path, "--backends", backend,
+                                  "--dim", str(args.dim), "--queries", str(args.queries), "--k", str(args.k)],
+                                 capture_output=True, text=True, check=True)
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            r["recall"] = sum(len(truth_ids & set(ids)) for truth_ids, ids in zip(truth, r["ids"])) / (
+                args.k * len(truth))
+            rows.append((backend, size, build_seconds, dir_size_mb(path), r))
+
+    print(f"\n{'backend':<8} {'vectors':>10} {'build s':>8} {'disk MB':>8} {'open s':>7} {'1st query s':>11} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'recall@' + str(args.k):>9} {'RSS MB':>7}")
+    for backend, size, build_seconds, mb, r in rows:
+        print(f"{backend:<8} {size:>10,} {build_seconds:>8.1f} {mb:>8.0f} {r['open_s']:>7.2f} "
+              f"{r['first_query_s']:>11.2f} {r['p50_ms']:>7.2f} {r['p95_ms']:>7.2f} {r['recall']:>9.3f} "
+              f"{r['rss_mb']:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Evaluate spaCy NER models on the held-out split of data/ner.
+
+    python scripts/eval_ner.py [--models en_core_web_sm models/ner_model] [--limit 2000] [--write-routes]
+
+Each model runs through the same batched engine the app uses (core.ner).
+Labels are compared after mapping the corpus tags (per, org, geo, tim, ...) to
+spaCy's names. The corpus (and so the custom model) tags every word as its own
+span, so spans on both sides are split into words and scored word by word.
+Reports micro precision/recall/F1 per label and overall, plus sentences/sec.
+With --write-routes the best model by F1 becomes the default route in
+models/ner_routes.json (existing per-type routes are kept).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import time
+from collections import Counter
+
+from core import config
+from core.ner import LABEL_MAP, extract_ner, load_ner_pipeline
+from core.ner_data import DATASET, load_dataset, split_dataset
+
+DEFAULT_LABELS = ("PERSON", "ORG", "GPE", "DATE")
+
+
+def prf(tp, fp, fn):
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def words(text, start, end, label):
+    """Split a span into ``(start, end, label)`` per space-separated word."""
+    out, pos = [], start
+    for word in text[start:end].split(" "):
+        if word:
+            out.append((pos, pos + len(word), label))
+        pos += len(word) + 1
+    return out
+
+
+def evaluate(nlp, test, labels):
+    texts = [text for text, _ in test]
+    t = time.perf_counter()
+    predicted = extract_ner(texts, nlp)
+    seconds = time.perf_counter() - t
+    counts = {label: Counter() for label in labels}
+    for (text, annot), ents in zip(test, predicted):
+        gold = {w for s, e, l in annot["entities"] for w in words(text, s, e, LABEL_MAP.get(l, l))}
+        pred = {w for e in ents for w in words(text, e.start, e.end, e.label)}
+        for label in labels:
+            g = {x for x in gold if x[2] == label}
+            p = {x for x in pred if x[2] == label}
+            counts[label].update(tp=len(g & p), fp=len(p - g), fn=len(g - p))
+    return counts, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DATASET)
+    parser.add_argument("--models", nargs="+", default=[config.SPACY_MODEL, config.NER_CUSTOM_MODEL])
+    parser.add_argument("--labels", nargs="+", default=list(DEFAULT_LABELS))
+    parser.add_argument("--limit", type=int, help="evaluate on the first N held-out sentences")
+    parser.add_argument("--write-routes", action="store_true", help=f"set the default route in {config.NER_ROUTES_FILE}")
+    args = parser.parse_args()
+
+    _, test = split_dataset(load_dataset(args.data))
+    test = test[:args.limit] if args.limit else test
+    print(f"{len(test)} held-out sentences from {args.data}\n")
+
+    scores = {}
+    for model in args.models:
+        if (os.sep in model or model.startswith(".")) and not os.path.isdir(model):
+            print(f"{model}: not found, skipped\n")
+            continue
+        counts, seconds = evaluate(load_ner_pipeline(model), test, args.labels)
+        total = sum(counts.values(), Counter())
+        precision, recall, f1 = prf(total["tp"], total["fp"], total["fn"])
+        scores[model] = f1
+        print(f"{model}: {len(test) / seconds:.0f} sentences/sec")
+        print(f"  {'label':<8} {'P':>6} {'R':>6} {'F1':>6}")
+        for label in args.labels:
+            p, r, f = prf(counts[label]["tp"], counts[label]["fp"], counts[label]["fn"])
+            print(f"  {label:<8} {p:>6.3f} {r:>6.3f} {f:>6.3f}")
+        print(f"  {'overall':<8} {precision:>6.3f} {recall:>6.3f} {f1:>6.3f}\n")
+
+    if args.write_routes and scores:
+        best = max(scores, key=scores.get)
+        routes = {}
+        if os.path.exists(config.NER_ROUTES_FILE):
+            with open(config.NER_ROUTES_FILE) as f:
+                routes = json.load(f)
+        routes["default"] = best
+        with open(config.NER_ROUTES_FILE, "w") as f:
+            json.dump(routes, f, indent=2)
+        print(f"Default route set to {best} in {config.NER_ROUTES_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Local stand-in for the Groq chat completions API.
+
+Point the app (or any script) at it with::
+
+    python scripts/fake_groq.py --port 8088 --latency 0.5
+    GROQ_BASE_URL=http://127.0.0.1:8088 GROQ_API_KEY=fake streamlit run app.py
+
+``GET /stats`` returns how many completions were served, which makes it easy
+to check that repeated calls are answered from the response cache.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COUNTS = {"completions": 0, "prompt_tokens": 0, "completion_tokens": 0}
+COUNTS_LOCK = threading.Lock()
+
+
+def fake_answer(prompt):
+    if "RISK_START" in prompt:
+        return ("RISK_START\nLevel: Medium\nClause: Either party may terminate without notice.\n"
+                "Reason: No notice period.\nSuggestion: Add a 30 day notice period.\nRISK_END")
+    if "Classify this document" in prompt:
+        return "Report"
+    if "comma-separated" in prompt:
+        return "Python, SQL, Project Management"
+    return f"Fake answer ({len(prompt)} prompt chars)."
+
+
+class Handler(BaseHTTPRequestHandler):
+    latency = 0.0
+    token_latency = 0.0
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            with COUNTS_LOCK:
+                return self._send(200, dict(COUNTS))
+        self._send(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send(404, {"error": {"message": "not found"}})
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = "\n".join(m.get("content", "") for m in request.get("messages", []))
+        content = fake_answer(prompt)
+        prompt_tokens = len(prompt.split())
+        completion_tokens = len(content.split())
+        time.sleep(self.latency)
+        with COUNTS_LOCK:
+            COUNTS["completions"] += 1
+            COUNTS["prompt_tokens"] += prompt_tokens
+            COUNTS["completion_tokens"] += completion_tokens
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        if request.get("stream"):
+            return self._stream(request, content, usage)
+        self._send(200, {
+            "id": f"chatcmpl-fake-{COUNTS['completions']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    def _stream(self, request, content, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        base = {"id": f"chatcmpl-fake-{COUNTS['completions']}", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": request.get("model", "fake")}
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            delta = {"content": word if i == 0 else " " + word}
+            self._event({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+            time.sleep(self.token_latency)
+        self._event({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                     "x_groq": {"id": base["id"], "usage": usage}})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _event(self, payload):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to sleep per completion")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="seconds between streamed tokens")
+    args = parser.parse_args()
+    Handler.latency = args.latency
+    Handler.token_latency = args.token_latency
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Fake Groq listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
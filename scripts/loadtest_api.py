@@ -0,0 +1,103 @@
+"""Load-test the HTTP API (``python -m core.api``).
+
+    python scripts/loadtest_api.py --url http://127.0.0.1:8000 --concurrency 16 --requests 400
+
+Uploads a sample document once, then fires a mix of ask/classify/entities/risks
+requests from ``--concurrency`` client threads and reports throughput, latency
+percentiles and status codes (503 means the server shed load; ``conn-error``
+counts refused, reset and timed-out connections). Run it against
+``scripts/fake_groq.py`` to measure the service without spending tokens.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from core.metrics import percentile
+from qa import DEFAULT_QA, ROOT, load_qa
+
+CONNECTION_ERROR = "conn-error"
+
+
+def post(url, payload, raw=False, timeout=120):
+    data = payload if raw else json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(url, data=data, method="POST",
+                                     headers={"Content-Type": "application/octet-stream" if raw else "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+    except OSError as e:
+        # URLError, resets and timeouts: an overloaded server must not stop the run
+        return CONNECTION_ERROR, {"error": str(e)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--doc", default=os.path.join(ROOT, "scripts", "data", "sample_contract.txt"))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--mix", default="ask=6,classify=2,entities=1,risks=1",
+                        help="endpoint weights, e.g. ask=1 for questions only")
+    args = parser.parse_args()
+
+    with open(args.doc, "rb") as f:
+        status, doc = post(f"{args.url}/upload?filename={os.path.basename(args.doc)}", f.read(), raw=True)
+    if status != 200:
+        sys.exit(f"upload failed ({status}): {doc}")
+    doc_id = doc["doc_id"]
+    print(f"Uploaded {args.doc} as {doc_id} ({doc['doc_type']}, reused={doc['reused']})")
+
+    questions = [item["question"] for item in load_qa(DEFAULT_QA)] or ["What are the payment terms?"]
+    weights = dict((name, int(w)) for name, w in (part.split("=") for part in args.mix.split(",")))
+    endpoints = [name for name, w in weights.items() for _ in range(w)]
+    rng = random.Random(0)
+    plan = [rng.choice(endpoints) for _ in range(args.requests)]
+    counter = itertools.count()
+
+    latencies, statuses = defaultdict(list), Counter()
+    lock = threading.Lock()
+
+    def one(endpoint):
+        payload = {"doc_id": doc_id}
+        if endpoint == "ask":
+            payload["question"] = questions[next(counter) % len(questions)]
+        t = time.perf_counter()
+        status, _ = post(f"{args.url}/{endpoint}", payload)
+        ms = (time.perf_counter() - t) * 1000
+        with lock:
+            statuses[status] += 1
+            if status == 200:
+                latencies[endpoint].append(ms)
+                latencies["all"].append(ms)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, plan))
+    seconds = time.perf_counter() - start
+
+    print(f"\n{args.requests} requests in {seconds:.2f}s with {args.concurrency} clients: "
+          f"{args.requests / seconds:.1f} req/s ({len(latencies['all']) / seconds:.1f} successful req/s)")
+    print("Status codes: " + ", ".join(f"{code}: {n}" for code, n in sorted(statuses.items(), key=lambda item: str(item[0]))))
+    print(f"\n{'endpoint':<10} {'ok':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint in ["all"] + sorted(k for k in latencies if k != "all"):
+        values = latencies[endpoint]
+        print(f"{endpoint:<10} {len(values):>6} {percentile(values, 50):>9.1f} "
+              f"{percentile(values, 95):>9.1f} {percentile(values, 99):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
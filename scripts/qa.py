@@ -0,0 +1,24 @@
+"""Helpers shared by the retrieval benchmarks: the labelled Q&A set and hit checks."""
+import json
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_QA = os.path.join(ROOT, "scripts", "data", "sample_qa.jsonl")
+
+
+def load_qa(path=DEFAULT_QA):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_docs(qa):
+    docs = {}
+    for item in qa:
+        if item["doc"] not in docs:
+            with open(os.path.join(ROOT, item["doc"]), encoding="utf-8") as f:
+                docs[item["doc"]] = f.read()
+    return docs
+
+
+def contains_answer(chunk_text, answer):
+    return " ".join(answer.split()).lower() in " ".join(chunk_text.split()).lower()
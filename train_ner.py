@@ -1,48 +1,15 @@
+import random
+
 import spacy
-import pandas as pd
 from spacy.training.example import Example
-import random
+
+from core.ner_data import load_dataset, split_dataset
 
 # Load base model
 nlp = spacy.load("en_core_web_sm")
 
-# Read dataset
-df = pd.read_csv("data/ner/ner_dataset.csv", encoding="latin1")
-
-df = df.ffill()
-
-sentences = []
-entities = []
-current_words = []
-current_tags = []
-
-for word, tag in zip(df["Word"], df["Tag"]):
-    current_words.append(word)
-    current_tags.append(tag)
-
-    if word == ".":
-        sentences.append(current_words)
-        entities.append(current_tags)
-        current_words = []
-        current_tags = []
-
-train_data = []
-
-for words, tags in zip(sentences, entities):
-    text = " ".join(words)
-    ents = []
-    start = 0
-
-    for word, tag in zip(words, tags):
-        end = start + len(word)
-
-        if tag != "O":
-            label = tag.split("-")[-1]
-            ents.append((start, end, label))
-
-        start = end + 1
-
-    train_data.append((text, {"entities": ents}))
+# Read dataset; the held-out split is kept for scripts/eval_ner.py
+train_data, _ = split_dataset(load_dataset())
 
 # Training
 optimizer = nlp.resume_training()